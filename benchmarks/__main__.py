@@ -0,0 +1,60 @@
+"""python -m benchmarks --users 1000 --news 100000 --baseline benchmarks/baseline.json"""
+import argparse
+import asyncio
+import os
+import platform
+import sys
+from datetime import datetime
+
+# every scenario logs in from one client IP: the per-IP auth rate limit would turn it into a 429 benchmark.
+# Set before src.config is imported (directly or by the uvicorn subprocess, which inherits the environment)
+os.environ.setdefault("AUTH_RATE_PER_SECOND", "0")
+
+from . import report, seed
+from .runner import asgi_client, run_all, uvicorn_client
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HTTP benchmarks for the news and auth APIs")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--news", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --transport uvicorn")
+    parser.add_argument("--scenario", action="append", help="run only these (register, login, list, get, update)")
+    parser.add_argument("--no-seed", action="store_true", help="reuse the dataset from a previous run")
+    parser.add_argument("--out", default="benchmarks/results.json")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed regression, 0.1 = 10%%")
+    return parser.parse_args()
+
+
+async def main(args) -> int:
+    if not args.no_seed:
+        await seed.reset()
+    dataset = await seed.seed(0 if args.no_seed else args.users, 0 if args.no_seed else args.news)
+
+    client_factory = asgi_client() if args.transport == "asgi" else uvicorn_client(args.workers)
+    async with client_factory as client:
+        scenarios = await run_all(client, dataset, args.requests, args.concurrency, args.scenario)
+
+    results = {
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "threshold")},
+        "scenarios": scenarios,
+    }
+    report.print_table(results)
+    report.save(results, args.out)
+
+    if args.baseline:
+        regressions = report.compare(results, report.load(args.baseline), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,48 @@
+import json
+from statistics import quantiles
+from typing import List
+
+
+def summarize(latencies: List[float], wall_time: float, errors: int) -> dict:
+    ordered = sorted(latencies)
+    cuts = quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "throughput_rps": len(ordered) / wall_time if wall_time else 0.0,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Scenarios whose p95 grew or throughput fell by more than `threshold` (0.1 = 10%)"""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.1f}ms -> {current['p95_ms']:.1f}ms")
+        if current["throughput_rps"] < before["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {before['throughput_rps']:.1f} -> "
+                               f"{current['throughput_rps']:.1f} rps")
+    return regressions
+
+
+def print_table(results: dict):
+    print(f"{'scenario':<12}{'reqs':>8}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}")
+    for name, s in results["scenarios"].items():
+        print(f"{name:<12}{s['requests']:>8}{s['errors']:>6}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}"
+              f"{s['p99_ms']:>10.1f}{s['throughput_rps']:>10.1f}")
+
+
+def save(results: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,124 @@
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List
+
+import httpx
+
+from .report import summarize
+from .seed import PASSWORD
+
+
+@asynccontextmanager
+async def asgi_client():
+    """Drive the app in-process, no sockets involved"""
+    from src.main import app
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+    finally:
+        await app.router.shutdown()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(workers: int = 1):
+    """Drive a real uvicorn server over TCP"""
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port),
+                             "--workers", str(workers), "--log-level", "warning"], env=os.environ.copy())
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            for _ in range(100):
+                try:
+                    await client.get("/docs")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            yield client
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+async def run_scenario(request: Callable[[int], Awaitable[httpx.Response]], total: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < total:
+            start = time.perf_counter()
+            try:
+                response = await request(i)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+async def login(client: httpx.AsyncClient, email: str) -> str:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_all(client: httpx.AsyncClient, dataset: dict, requests: int, concurrency: int,
+                  only: List[str] = None) -> dict:
+    run_id = int(time.time())
+    subscribers = dataset["subscribers"]
+    articles = dataset["articles"]
+    author_tokens = {author_id: await login(client, email) for author_id, email in dataset["authors"].items()}
+
+    def register(i):
+        return client.post("/api/v1/auth/register",
+                           json={"email": f"bench-reg-{run_id}-{i}@example.com", "password": PASSWORD})
+
+    def do_login(i):
+        return client.post("/api/v1/auth/login",
+                           json={"email": subscribers[i % len(subscribers)], "password": PASSWORD})
+
+    def list_news(i):
+        return client.get("/api/v1/news")
+
+    def get_news(i):
+        return client.get(f"/api/v1/news/{articles[i % len(articles)][0]}")
+
+    def update_news(i):
+        news_id, author_id = articles[i % len(articles)]
+        return client.put(f"/api/v1/news/{news_id}",
+                          json={"title": f"Bench article {news_id} rev {i}", "content": "updated", "is_public": True},
+                          headers={"Authorization": f"Bearer {author_tokens[author_id]}"})
+
+    scenarios = {"register": register, "login": do_login, "list": list_news, "get": get_news,
+                 "update": update_news}
+    results = {}
+    for name, request in scenarios.items():
+        if only and name not in only:
+            continue
+        # bcrypt-bound scenarios are an order of magnitude slower, keep their runs short
+        total = max(concurrency, requests // 10) if name in ("register", "login") else requests
+        results[name] = await run_scenario(request, total, concurrency)
+    return results
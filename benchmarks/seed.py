@@ -0,0 +1,74 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+
+from src.auth.models import User
+from src.database import async_session_maker
+from src.news.models import News
+from src.utils.utils import get_password_hash
+
+EMAIL_PREFIX = "bench-"
+PASSWORD = "bench12345"
+# get_current_author only lets this role write news
+AUTHOR_ROLE = "автор"
+
+
+def bench_email(i: int) -> str:
+    return f"{EMAIL_PREFIX}{i}@example.com"
+
+
+async def reset():
+    async with async_session_maker() as session:
+        bench_users = select(User.id).where(User.email.like(f"{EMAIL_PREFIX}%"))
+        await session.execute(delete(News).where(News.author_id.in_(bench_users)))
+        await session.execute(delete(User).where(User.email.like(f"{EMAIL_PREFIX}%")))
+        await session.commit()
+
+
+async def seed(users: int, news: int, batch_size: int = 1000, seed: int = 0) -> dict:
+    """Insert `users` users (every tenth an author) and `news` articles spread over the last year"""
+    rng = random.Random(seed)
+    password = get_password_hash(PASSWORD)
+    async with async_session_maker() as session:
+        user_rows = [{
+            "email": bench_email(i),
+            "password": password,
+            "is_active": True,
+            "is_superuser": False,
+            "is_verified": True,
+            "role": AUTHOR_ROLE if i % 10 == 0 else "subscriber",
+        } for i in range(users)]
+        for start in range(0, len(user_rows), batch_size):
+            await session.execute(insert(User), user_rows[start:start + batch_size])
+        await session.flush()
+        res = await session.execute(
+            select(User.id, User.email, User.role).where(User.email.like(f"{EMAIL_PREFIX}%")))
+        rows = res.all()
+        authors = [row for row in rows if row.role == AUTHOR_ROLE]
+
+        now = datetime.utcnow()
+        for start in range(0, news, batch_size):
+            batch = []
+            for i in range(start, min(start + batch_size, news)):
+                created = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+                batch.append({
+                    "title": f"Bench article {i}",
+                    "content": " ".join(rng.choice(("lorem", "ipsum", "dolor", "sit", "amet")) for _ in range(300)),
+                    "author_id": rng.choice(authors).id,
+                    "is_public": rng.random() < 0.8,
+                    "created_at": created,
+                    "updated_at": created,
+                })
+            await session.execute(insert(News), batch)
+        await session.commit()
+
+        res = await session.execute(select(News.id, News.author_id)
+                                    .where(News.author_id.in_([a.id for a in authors]), News.is_public.is_(True))
+                                    .limit(1000))
+        articles = res.all()
+    return {
+        "subscribers": [row.email for row in rows if row.role != AUTHOR_ROLE],
+        "authors": {a.id: a.email for a in authors},
+        "articles": [(row.id, row.author_id) for row in articles],
+    }
@@ -0,0 +1,25 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from prometheus_client import multiprocess
+
+# picked up automatically by `gunicorn src.main:app ...` from the working directory
+
+
+def on_starting(server):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+    # once per deployment instead of once per worker; on failure the workers fall back to the locked check
+    if os.environ.get("SUPERUSER_BOOTSTRAP", "startup") == "startup":
+        if subprocess.run([sys.executable, "-m", "src.bootstrap"]).returncode == 0:
+            os.environ["SUPERUSER_BOOTSTRAP"] = "skip"
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
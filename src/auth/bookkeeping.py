@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import LOGIN_FLUSH_INTERVAL, LOGIN_FLUSH_MAX_PENDING
+from src.utils.unitofwork import UnitOfWork
+from .cache import invalidate_principal
+
+logger = logging.getLogger(__name__)
+
+
+class LoginBookkeeper:
+    """Write-behind buffer for login side effects (is_verified, last_login_at, login_count).
+
+    Login only records into memory; flush() writes everything pending in one batched UPDATE,
+    on an interval, when the buffer grows past max_pending, and at shutdown.
+    """
+
+    def __init__(self, interval: float, max_pending: int):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: dict[int, tuple[datetime, int]] = {}
+        self._newly_verified: set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._flushing = asyncio.Lock()
+        self._wake = asyncio.Event()
+
+    def record(self, user_id: int, was_verified: bool = True):
+        _, count = self._pending.get(user_id, (None, 0))
+        self._pending[user_id] = (datetime.utcnow(), count + 1)
+        if not was_verified:
+            self._newly_verified.add(user_id)
+        if len(self._pending) >= self.max_pending:
+            # flush early from the _run loop
+            self._wake.set()
+
+    async def flush(self) -> int:
+        async with self._flushing:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            verified, self._newly_verified = self._newly_verified, set()
+            try:
+                async with UnitOfWork() as uow:
+                    await uow.users.record_logins(batch)
+                    await uow.commit()
+            except SQLAlchemyError:
+                logger.warning("login bookkeeping flush failed, %d users kept for retry", len(batch), exc_info=True)
+                self._merge_back(batch, verified)
+                return 0
+        for user_id in verified:
+            await invalidate_principal(user_id)
+        return len(batch)
+
+    def _merge_back(self, batch: dict[int, tuple[datetime, int]], verified: set[int]):
+        for user_id, (ts, count) in batch.items():
+            newer_ts, newer_count = self._pending.get(user_id, (ts, 0))
+            self._pending[user_id] = (max(ts, newer_ts), count + newer_count)
+        self._newly_verified |= verified
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), "interval": self.interval, "max_pending": self.max_pending}
+
+
+login_bookkeeper = LoginBookkeeper(LOGIN_FLUSH_INTERVAL, LOGIN_FLUSH_MAX_PENDING)
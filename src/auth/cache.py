@@ -0,0 +1,80 @@
+from typing import Optional
+
+from src.config import AUTH_CACHE_TTL, AUTH_CACHE_MAX_ENTRIES
+from src.news.broker import news_broker
+from src.utils.cache import LocalCache, TTLCache, cache
+from src.utils.replica import mark_changed
+from src.utils.singleflight import SingleFlight
+from .schemas import UserRead
+
+principal_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL)
+# concurrent principal misses for one user share a single lookup
+principal_flight = SingleFlight("principal")
+
+
+def token_version_key(user_id: int) -> str:
+    return f"user:ver:{user_id}"
+
+
+def principal_key(user_id: int) -> str:
+    return f"user:principal:{user_id}"
+
+
+def principal_claims(user) -> dict:
+    """Access-token claims for `user`, enough to rebuild UserRead without a query"""
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "role": user.role,
+        "is_superuser": user.is_superuser,
+        "is_active": user.is_active,
+        "is_verified": user.is_verified,
+        "ver": user.token_version,
+    }
+
+
+def principal_from_claims(payload: dict) -> Optional[UserRead]:
+    try:
+        return UserRead(
+            id=int(payload["sub"]),
+            email=payload["email"],
+            role=payload["role"],
+            is_superuser=payload["is_superuser"],
+            is_active=payload["is_active"],
+            is_verified=payload["is_verified"],
+        )
+    except (KeyError, ValueError):
+        return None
+
+
+async def get_token_version(user_id: int) -> Optional[int]:
+    version = await cache.get(token_version_key(user_id))
+    return int(version) if version is not None else None
+
+
+async def set_token_version(user_id: int, version: int):
+    await cache.set(token_version_key(user_id), str(version), ttl=AUTH_CACHE_TTL)
+
+
+def _drop_local(user_id: int):
+    principal_cache.pop(user_id)
+    principal_flight.forget(user_id)
+    if isinstance(cache, LocalCache):
+        # without Redis every worker holds its own token versions
+        cache.discard(token_version_key(user_id))
+
+
+def _on_event(event: dict):
+    if event["type"] == "principal":
+        _drop_local(event["id"])
+
+
+async def invalidate_principal(user_id: int):
+    """Drop the user's cached principal and token version here, then on every other worker"""
+    await mark_changed(principal_key(user_id))
+    _drop_local(user_id)
+    await cache.delete(token_version_key(user_id))
+    await news_broker.publish({"type": "principal", "id": user_id})
+
+
+news_broker.add_listener(_on_event)
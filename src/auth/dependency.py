@@ -4,20 +4,66 @@ from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.security.utils import get_authorization_scheme_param
 from jose import JWTError, jwt
-from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
 
-from src.database import get_async_session
+from src.config import AUTH_TRUST_TOKEN_CLAIMS
+from src.database import read_session_maker
+from .cache import (principal_cache, principal_flight, principal_from_claims, principal_key, get_token_version,
+                    set_token_version)
 from .exceptions import credentials_exception, admin_rights_exception
 from .jwt import SECRET_KEY, ALGORITHM
 from .models import User
 from .schemas import UserRead
+from src.utils.metrics import CACHE_REQUESTS
+from src.utils.replica import may_cache, should_use_primary
 from src.utils.unitofwork import UnitOfWork
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme),
-                           session: AsyncSession = Depends(get_async_session)):
+async def _load_principal(user_id: int) -> Optional[tuple[UserRead, int]]:
+    """(UserRead, token_version) from the DB, caching both; runs single-flight per user"""
+    async with read_session_maker()() as session:
+        user = await session.get(User, user_id)
+        if user is None:
+            return None
+        principal, version = UserRead.model_validate(user), user.token_version
+    if await may_cache(principal_key(user_id)):
+        principal_cache.set(user_id, principal)
+        await set_token_version(user_id, version)
+    return principal, version
+
+
+async def _fetch_principal(user_id: int) -> Optional[tuple[UserRead, int]]:
+    if should_use_primary():
+        # the client just changed something: read it back from the primary, alone
+        return await _load_principal(user_id)
+    return await principal_flight.do(user_id, lambda: _load_principal(user_id))
+
+
+async def _get_principal(user_id: int, payload: dict) -> Optional[UserRead]:
+    """UserRead for the token owner, from claims or the principal cache when possible"""
+    if AUTH_TRUST_TOKEN_CLAIMS and "ver" in payload:
+        version = None if should_use_primary() else await get_token_version(user_id)
+        if version is None:
+            loaded = await _fetch_principal(user_id)
+            if loaded is None:
+                return None
+            version = loaded[1]
+        if payload["ver"] == version:
+            return principal_from_claims(payload)
+        return None
+
+    principal = None if should_use_primary() else principal_cache.get(user_id)
+    CACHE_REQUESTS.labels("principal", "miss" if principal is None else "hit").inc()
+    if principal is None:
+        loaded = await _fetch_principal(user_id)
+        if loaded is None:
+            return None
+        principal = loaded[0]
+    return principal
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -26,10 +72,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme),
         user_id = int(user_id)
     except (JWTError, ValueError):
         raise credentials_exception
-    user = await session.get(User, user_id)
+    user = await _get_principal(user_id, payload)
     if user is None:
         raise credentials_exception
-    return UserRead.model_validate(user)
+    return user
 
 
 
@@ -40,8 +86,7 @@ async def get_current_superuser(current_user: UserRead = Depends(get_current_use
     return current_user
 
 
-async def get_optional_current_user(request: Request, session: AsyncSession = Depends(get_async_session)) -> Optional[
-    UserRead]:
+async def get_optional_current_user(request: Request) -> Optional[UserRead]:
     authorization: Optional[str] = request.headers.get("Authorization")
     if not authorization:
         return None
@@ -50,6 +95,11 @@ async def get_optional_current_user(request: Request, session: AsyncSession = De
     if scheme.lower() != "bearer":
         return None
 
+    return await principal_from_token(token)
+
+
+async def principal_from_token(token: str) -> Optional[UserRead]:
+    """UserRead for a bearer token, None when it is invalid (for callers outside the HTTP dependencies)"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -59,11 +109,11 @@ async def get_optional_current_user(request: Request, session: AsyncSession = De
     except (JWTError, ValueError):
         return None
 
-    user = await session.get(User, user_id)
-    if user is None:
-        return None
-
-    return UserRead.model_validate(user)
+    return await _get_principal(user_id, payload)
 
 async def get_uow():
     return UnitOfWork()
+
+
+async def get_read_uow():
+    return UnitOfWork(read_only=True)
@@ -1,4 +1,7 @@
-from sqlalchemy import (Boolean, Integer, String)
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (Boolean, Integer, String, TIMESTAMP, Index, func)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.auth.schemas import UserRead
@@ -16,6 +19,11 @@ class User(Base):
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     role: Mapped[str] = mapped_column(String, nullable=False, default="subscriber")
+    # bumped whenever issued tokens must stop carrying trusted claims
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # login bookkeeping, written behind by src.auth.bookkeeping
+    last_login_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+    login_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     news = relationship("News", back_populates="author")
 
@@ -29,3 +37,8 @@ class User(Base):
             is_verified=self.is_verified,
             role=self.role,
         )
+
+
+# email prefix search in the admin listing: lower(email) LIKE 'prefix%'
+Index("ix_users_email_lower_pattern", func.lower(User.email).label("email_lower"),
+      postgresql_ops={"email_lower": "text_pattern_ops"})
@@ -1,6 +1,46 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import bindparam, func, select, text, update
+
 from src.auth.models import User
+from src.utils.pagination import DEFAULT_LIMIT, Page
 from src.utils.repository import SQLAlchemyRepository
 
 
 class UsersRepository(SQLAlchemyRepository):
     model = User
+    read_columns = ("id", "email", "is_active", "is_superuser", "is_verified", "role")
+
+    async def find_users(self, cursor: str = None, limit: int = DEFAULT_LIMIT, email_prefix: Optional[str] = None,
+                         **filter_by) -> Page:
+        """Newest first; email_prefix is case-insensitive and served by ix_users_email_lower_pattern"""
+        criteria = ()
+        if email_prefix:
+            pattern = email_prefix.lower().replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+            # inlined so the planner sees a constant prefix and can use the index
+            criteria = (func.lower(User.email).like(bindparam("email_pattern", pattern, literal_execute=True),
+                                                    escape="/"),)
+        return await self.find_page(cursor, limit, criteria=criteria, **filter_by)
+
+    async def estimate_count(self) -> Optional[int]:
+        """pg_class.reltuples, as fresh as the last VACUUM / ANALYZE; None if never analyzed"""
+        count = await self.session.scalar(text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+                                          {"name": User.__tablename__})
+        return count if count is not None and count >= 0 else None
+
+    async def try_advisory_lock(self, key: int) -> bool:
+        """Transaction-scoped Postgres advisory lock; False if another session holds it"""
+        return await self.session.scalar(select(func.pg_try_advisory_xact_lock(key)))
+
+    async def record_logins(self, logins: dict[int, tuple[datetime, int]]):
+        """One executemany UPDATE for {user_id: (last_login_at, logins)}; ids sorted so workers lock in the same order"""
+        users = User.__table__
+        stmt = (update(users)
+                .where(users.c.id == bindparam("uid"))
+                .values(is_verified=True,
+                        last_login_at=func.greatest(func.coalesce(users.c.last_login_at, bindparam("ts")),
+                                                    bindparam("ts")),
+                        login_count=users.c.login_count + bindparam("n")))
+        await self.session.execute(stmt, [{"uid": user_id, "ts": ts, "n": n}
+                                          for user_id, (ts, n) in sorted(logins.items())])
@@ -1,15 +1,18 @@
-from typing import List
+from typing import Optional
 
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy import false
 
 from .schemas import UserCreate, UserUpdate, UserLogin, PasswordChange, TokenRefresh,  SuperUser
 from .service import UserService
-from .dependency import get_uow, get_current_user, get_current_superuser
-from .schemas import UserRead
+from .dependency import get_uow, get_read_uow, get_current_user, get_current_superuser
+from .schemas import UserRead, UserPage
+from src.utils.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from src.utils.responses import ORJSONResponse, ORJSONRoute
 from src.utils.unitofwork import IUnitOfWork
 
-router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
+router = APIRouter(prefix="/api/v1/auth", tags=["auth"], route_class=ORJSONRoute,
+                   default_response_class=ORJSONResponse)
 
 @router.post("/register", status_code=201)
 async def register(response: Response,
@@ -42,7 +45,7 @@ async def create_author(user: UserCreate,  uow: IUnitOfWork = Depends(get_uow),
 
 
 @router.post("/login", status_code=200)
-async def login(user: UserLogin, response: Response, uow: IUnitOfWork = Depends(get_uow)):
+async def login(user: UserLogin, response: Response, uow: IUnitOfWork = Depends(get_read_uow)):
     """returns access in cookies nad refresh in the cookies http-only"""
     result = await UserService().authenticate_user(response, uow, user.email, user.password)
 
@@ -51,7 +54,7 @@ async def login(user: UserLogin, response: Response, uow: IUnitOfWork = Depends(
 
 
 @router.get("/profile",response_model=UserRead, status_code=200)
-async def get_profile(current_user: UserRead = Depends(get_current_user), uow: IUnitOfWork = Depends(get_uow)):
+async def get_profile(current_user: UserRead = Depends(get_current_user), uow: IUnitOfWork = Depends(get_read_uow)):
     user = await UserService().get_user(uow, current_user.id)
     """Nothing"""
     return user
@@ -100,7 +103,7 @@ async def change_password(password_data: PasswordChange, current_user: UserRead
 
 @router.get("/{user_id}", response_model=UserRead, status_code=200)
 async def get_user(user_id: int,
-                   uow: IUnitOfWork = Depends(get_uow),
+                   uow: IUnitOfWork = Depends(get_read_uow),
                    current_user: UserRead = Depends(get_current_superuser)):
     """Pon"""
     user = await UserService().get_user(uow, user_id)
@@ -126,9 +129,17 @@ async def delete_user(user_id: int, current_user: UserRead = Depends(get_current
     return {"msg": "User deleted"}
 
 
-@router.get("/users/all", response_model=List[UserRead], status_code=200)
-async def get_all_users(uow: IUnitOfWork = Depends(get_uow),
-                    ):
-    """EVERY"""
-    users = await UserService().get_all_users(uow)
+@router.get("/users/all", response_model=UserPage, status_code=200)
+async def get_all_users(cursor: Optional[str] = None,
+                        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                        role: Optional[str] = None,
+                        is_active: Optional[bool] = None,
+                        is_superuser: Optional[bool] = None,
+                        email: Optional[str] = Query(None, min_length=1, max_length=320),
+                        uow: IUnitOfWork = Depends(get_read_uow),
+                        current_user: UserRead = Depends(get_current_superuser)):
+    """ONLY SUPERUSER. Newest first by next_cursor, filters on role / is_active / is_superuser,
+    email is a case-insensitive prefix; approximate_total comes from table statistics"""
+    users = await UserService().get_all_users(uow, cursor, limit, role=role, is_active=is_active,
+                                              is_superuser=is_superuser, email_prefix=email)
     return users
\ No newline at end of file
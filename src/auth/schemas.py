@@ -1,8 +1,10 @@
 import re
-from typing import Annotated
+from typing import Annotated, Optional
 
 from pydantic import BaseModel, EmailStr, Field, validator, field_validator
 
+from src.utils.pagination import Page
+
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -29,6 +31,11 @@ class UserRead(BaseModel):
         from_attributes = True
 
 
+class UserPage(Page[UserRead]):
+    # estimate for the whole table, filters are not applied
+    approximate_total: Optional[int] = None
+
+
 class SuperUser(BaseModel):
     email: EmailStr
     password: Annotated[str, Field(min_length=2, max_length=30)]
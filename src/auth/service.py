@@ -1,7 +1,12 @@
+from typing import Optional
+
 from src.config import SUPER_USER_EMAIL, SUPER_USER_PASSWORD
+from src.utils.pagination import DEFAULT_LIMIT
 from src.utils.unitofwork import IUnitOfWork
 from fastapi import Response
-from src.utils.utils import get_password_hash, verify_password
+from src.utils.utils import password_hasher
+from .bookkeeping import login_bookkeeper
+from .cache import invalidate_principal, principal_claims
 from .exceptions import (
     validate_user_existence,
     validate_user_authentication,
@@ -9,14 +14,16 @@ from .exceptions import (
     user_already_exists_exception,
 )
 from .jwt import create_access_token, decode_token, create_refresh_token
-from .schemas import UserCreate, UserUpdate, PasswordChange, SuperUser
+from .models import User
+from .schemas import UserCreate, UserUpdate, PasswordChange, SuperUser, UserRead, UserPage
+
+SUPERUSER_BOOTSTRAP_LOCK = 0x5EED0001
 
 
 class UserService:
     async def _create_user(self, uow: IUnitOfWork, response: Response = None, user_data: dict = None, role: str = "subscriber", is_superuser: bool = False):
+        user_data["password"] = await password_hasher.hash(user_data.pop("password"))
         async with uow:
-            password = get_password_hash(user_data.pop("password"))
-            user_data["password"] = password
             user_data["role"] = role
             user_data["is_superuser"] = is_superuser
 
@@ -27,12 +34,13 @@ class UserService:
             user = await uow.users.add_one(user_data)
             await uow.commit()
 
+            access_token = create_access_token(principal_claims(user))
             if response:
-                response.set_cookie(key="access_token", value=f"Bearer: {create_access_token({'sub': str(user)})}")
-                response.set_cookie(key="refresh_token", value=f"Bearer: {create_refresh_token({'sub': str(user)})}", httponly=True)
+                response.set_cookie(key="access_token", value=f"Bearer: {access_token}")
+                response.set_cookie(key="refresh_token", value=f"Bearer: {create_refresh_token({'sub': str(user.id)})}", httponly=True)
             return {"message": "User created successfully",
                     "user_id": user.id,
-                    "access_token": create_access_token({"sub": str(user)})}
+                    "access_token": access_token}
 
     async def create_user(self, uow: IUnitOfWork, response: Response, user: UserCreate, role: str = "subscriber"):
         user_data = user.model_dump()
@@ -44,66 +52,92 @@ class UserService:
 
     async def update_superuser(self, uow: IUnitOfWork, user: SuperUser):
         user_data = user.model_dump()
+        user_data["password"] = await password_hasher.hash(user_data.pop("password"))
         async with uow:
-            password = get_password_hash(user_data.pop("password"))
-            user_data["password"] = password
             user_data["is_superuser"] = True
 
             existing_user = await uow.users.find_one(email=user_data["email"])
             if existing_user:
+                user_data["token_version"] = User.token_version + 1
                 await uow.users.edit_one(existing_user.id, user_data)
                 user_id = existing_user.id
             else:
-                user_id = await uow.users.add_one(user_data)
+                user_id = (await uow.users.add_one(user_data)).id
 
             await uow.commit()
+        await invalidate_principal(user_id)
 
-    async def create_default_superuser(self, uow: IUnitOfWork):
-        superuser_data = SuperUser(
-            email=SUPER_USER_EMAIL,
-            password=SUPER_USER_PASSWORD,
-            role = "superuser",
-            is_superuser=True
-        )
-        await self.update_superuser(uow, superuser_data)
+    async def create_default_superuser(self, uow: IUnitOfWork) -> str:
+        """Idempotent: "created", "updated", "unchanged", or "locked" when another process is doing it.
+
+        An account that already matches costs one verify and no write (so its tokens stay valid).
+        """
+        async with uow:
+            if not await uow.users.try_advisory_lock(SUPERUSER_BOOTSTRAP_LOCK):
+                return "locked"
+            user = await uow.users.find_one(email=SUPER_USER_EMAIL)
+            if (user is not None and user.is_superuser and user.role == "superuser"
+                    and await password_hasher.verify(SUPER_USER_PASSWORD, user.password)):
+                return "unchanged"
+
+            user_data = {"email": SUPER_USER_EMAIL, "password": await password_hasher.hash(SUPER_USER_PASSWORD),
+                         "role": "superuser", "is_superuser": True}
+            if user is None:
+                await uow.users.add_one(user_data)
+            else:
+                user_data["token_version"] = User.token_version + 1
+                await uow.users.edit_one(user.id, user_data)
+            await uow.commit()
+        if user is None:
+            return "created"
+        await invalidate_principal(user.id)
+        return "updated"
 
 
     async def authenticate_user(self, response:Response, uow: IUnitOfWork, email: str, password: str):
         async with uow:
             user = await uow.users.find_one(email=email)
             validate_user_authentication(user)
+            if not await password_hasher.verify(password, user.password):
+                validate_user_authentication(None)
 
-            user.is_verified = True
-            await uow.users.edit_one(user.id, {"is_verified": True})
+            # is_verified / last login / count are written behind, login itself stays a read
+            login_bookkeeper.record(user.id, was_verified=user.is_verified)
+            access_token = create_access_token({**principal_claims(user), "is_verified": True})
             if response:
-                response.set_cookie(key="access_token", value=f"Bearer: {create_access_token({'sub': str(user)})}")
-                response.set_cookie(key="refresh_token", value=f"Bearer: {create_refresh_token({'sub': str(user)})}",
+                response.set_cookie(key="access_token", value=f"Bearer: {access_token}")
+                response.set_cookie(key="refresh_token", value=f"Bearer: {create_refresh_token({'sub': str(user.id)})}",
                                     httponly=True)
 
-            await uow.commit()
             return {"message": "logged in successfully",
                     "user_id": user.id,
-                    "access_token": create_access_token({"sub": str(user)})}
+                    "access_token": access_token}
 
     async def get_user(self, uow: IUnitOfWork, user_id: int):
         async with uow:
-            user = await uow.users.find_one(id=user_id)
+            user = await uow.users.find_one_row(id=user_id)
             validate_user_existence(user)
-            return user.to_read_model()
+            return UserRead.model_validate(user)
 
-    async def get_all_users(self, uow: IUnitOfWork):
+    async def get_all_users(self, uow: IUnitOfWork, cursor: Optional[str] = None, limit: int = DEFAULT_LIMIT,
+                            role: Optional[str] = None, is_active: Optional[bool] = None,
+                            is_superuser: Optional[bool] = None, email_prefix: Optional[str] = None) -> UserPage:
         async with uow:
-            users = await uow.users.find_all()
-            return users
+            users_page = await uow.users.find_users(cursor, limit, email_prefix=email_prefix, role=role,
+                                                    is_active=is_active, is_superuser=is_superuser)
+            total = await uow.users.estimate_count()
+        return UserPage(items=[UserRead.model_validate(row) for row in users_page.items],
+                        next_cursor=users_page.next_cursor, approximate_total=total)
 
     async def update_user(self, uow: IUnitOfWork, user_id: int, user: UserUpdate):
         user_data = user.model_dump()
         async with uow:
             existing_user = await uow.users.find_one(id=user_id)
             validate_user_existence(existing_user)
+            user_data["token_version"] = User.token_version + 1
             await uow.users.edit_one(user_id, user_data)
             await uow.commit()
-            return user.to_read_model()
+        await invalidate_principal(user_id)
 
     async def delete_user(self, uow: IUnitOfWork, user_id: int):
         async with uow:
@@ -111,16 +145,18 @@ class UserService:
             validate_user_existence(user)
             await uow.users.delete_one(id=user_id)
             await uow.commit()
+        await invalidate_principal(user_id)
 
     async def change_password(self, uow: IUnitOfWork, user_id: int, password_data: PasswordChange):
         async with uow:
             user = await uow.users.find_one(id=user_id)
             validate_user_existence(user)
-            if not verify_password(password_data.old_password, user.password):
+            if not await password_hasher.verify(password_data.old_password, user.password):
                 validate_user_authentication(None)
-            user.password = get_password_hash(password_data.new_password)
-            await uow.users.edit_one(user_id, {"password": user})
+            await uow.users.edit_one(user_id, {"password": await password_hasher.hash(password_data.new_password),
+                                               "token_version": User.token_version + 1})
             await uow.commit()
+        await invalidate_principal(user_id)
 
     async def refresh_access_token(self, refresh_token: str):
         payload = decode_token(refresh_token)
@@ -0,0 +1,32 @@
+"""Deployment step: `python -m src.bootstrap` creates or repairs the default superuser once.
+
+gunicorn.conf.py runs it in the master before forking, then tells the workers to skip it.
+"""
+import asyncio
+import logging
+import sys
+
+from src.auth.service import UserService
+from src.database import engine
+from src.utils.unitofwork import UnitOfWork
+from src.utils.utils import password_hasher
+
+logger = logging.getLogger(__name__)
+
+
+async def bootstrap() -> str:
+    try:
+        return await UserService().create_default_superuser(UnitOfWork())
+    finally:
+        await engine.dispose()
+        password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        result = asyncio.run(bootstrap())
+    except Exception:
+        logger.exception("superuser bootstrap failed")
+        sys.exit(1)
+    logger.info("default superuser: %s", result)
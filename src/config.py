@@ -16,4 +16,62 @@ ALGORITHM = os.environ.get("ALGORITHM")
 SECRET_KEY = os.environ.get("SECRET_KEY")
 
 SUPER_USER_EMAIL = os.environ.get("SUPER_USER_EMAIL")
-SUPER_USER_PASSWORD = os.environ.get("SUPER_USER_PASSWORD")
\ No newline at end of file
+SUPER_USER_PASSWORD = os.environ.get("SUPER_USER_PASSWORD")
+# "startup": every process checks the default superuser (advisory-locked); "skip": a deploy step already did
+SUPERUSER_BOOTSTRAP = os.environ.get("SUPERUSER_BOOTSTRAP", "startup")
+
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+
+REDIS_HOST = os.environ.get("REDIS_HOST")
+REDIS_PORT = os.environ.get("REDIS_PORT", 6379)
+
+CACHE_TTL = int(os.environ.get("CACHE_TTL", 60))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 10000))
+
+# authenticated-principal cache, per worker; invalidations reach the other workers over LISTEN/NOTIFY,
+# AUTH_CACHE_TTL bounds staleness while that connection is down
+AUTH_CACHE_TTL = int(os.environ.get("AUTH_CACHE_TTL", 30))
+AUTH_CACHE_MAX_ENTRIES = int(os.environ.get("AUTH_CACHE_MAX_ENTRIES", 10000))
+# build the principal from signed access-token claims, checking only the token version
+AUTH_TRUST_TOKEN_CLAIMS = os.environ.get("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+
+# bcrypt releases the GIL, so a thread pool gives real parallelism
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 4))
+
+# login bookkeeping is buffered per worker and flushed every N seconds or once this many users are pending
+LOGIN_FLUSH_INTERVAL = float(os.environ.get("LOGIN_FLUSH_INTERVAL", 5))
+LOGIN_FLUSH_MAX_PENDING = int(os.environ.get("LOGIN_FLUSH_MAX_PENDING", 1000))
+
+# admission control, per worker: requests in flight and queued per route group (0 disables a group)
+ADMISSION_AUTH_CONCURRENCY = int(os.environ.get("ADMISSION_AUTH_CONCURRENCY", PASSWORD_HASH_WORKERS * 2))
+ADMISSION_AUTH_QUEUE = int(os.environ.get("ADMISSION_AUTH_QUEUE", PASSWORD_HASH_WORKERS * 8))
+ADMISSION_NEWS_CONCURRENCY = int(os.environ.get("ADMISSION_NEWS_CONCURRENCY", DB_POOL_SIZE + DB_MAX_OVERFLOW))
+ADMISSION_NEWS_QUEUE = int(os.environ.get("ADMISSION_NEWS_QUEUE", 100))
+ADMISSION_DEFAULT_CONCURRENCY = int(os.environ.get("ADMISSION_DEFAULT_CONCURRENCY", DB_POOL_SIZE + DB_MAX_OVERFLOW))
+ADMISSION_DEFAULT_QUEUE = int(os.environ.get("ADMISSION_DEFAULT_QUEUE", 100))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", 2))
+ADMISSION_RETRY_AFTER = int(os.environ.get("ADMISSION_RETRY_AFTER", 1))
+# token bucket per client IP on the auth router
+AUTH_RATE_PER_SECOND = float(os.environ.get("AUTH_RATE_PER_SECOND", 1))
+AUTH_RATE_BURST = int(os.environ.get("AUTH_RATE_BURST", 10))
+AUTH_RATE_MAX_CLIENTS = int(os.environ.get("AUTH_RATE_MAX_CLIENTS", 100000))
+
+NEWS_BULK_BATCH_SIZE = int(os.environ.get("NEWS_BULK_BATCH_SIZE", 1000))
+# identical concurrent reads share one query, which may take at most this many seconds
+SINGLEFLIGHT_TIMEOUT = float(os.environ.get("SINGLEFLIGHT_TIMEOUT", 5))
+# push of news events (SSE / WebSocket): events buffered per subscriber, idle seconds between pings
+NEWS_STREAM_QUEUE_SIZE = int(os.environ.get("NEWS_STREAM_QUEUE_SIZE", 100))
+NEWS_STREAM_HEARTBEAT = float(os.environ.get("NEWS_STREAM_HEARTBEAT", 15))
+# newest N summaries per audience kept in memory for list pages (0 disables), re-checked against the DB every N s
+NEWS_FEED_MAX_ITEMS = int(os.environ.get("NEWS_FEED_MAX_ITEMS", 10000))
+NEWS_FEED_CHECK_INTERVAL = float(os.environ.get("NEWS_FEED_CHECK_INTERVAL", 60))
+
+# optional streaming replica, same credentials as the primary
+DB_REPLICA_HOST = os.environ.get("DB_REPLICA_HOST")
+DB_REPLICA_PORT = os.environ.get("DB_REPLICA_PORT", DB_PORT)
+# after a write, the same client reads from the primary for this long (covers replication lag)
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get("DB_REPLICA_STICKY_SECONDS", 5))
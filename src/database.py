@@ -4,18 +4,52 @@ from sqlalchemy import MetaData
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
 
-from .config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from .config import (DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+                     DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_REPLICA_HOST, DB_REPLICA_PORT)
+from .utils.metrics import instrument_engine
+from .utils.pool import InstrumentedQueuePool
+from .utils.replica import should_use_primary
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 Base = declarative_base()
 
 metadata = MetaData()
 
-engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+REPLICA_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_NAME}"
+
+
+def _create_engine(url: str):
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    instrument_engine(engine)
+    return engine
+
+
+engine = _create_engine(DATABASE_URL)
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# reads run in autocommit: no BEGIN / ROLLBACK round trips around a single SELECT
+primary_read_session_maker = sessionmaker(engine.execution_options(isolation_level="AUTOCOMMIT"),
+                                          class_=AsyncSession, expire_on_commit=False)
+
+# without a replica, reads simply share the primary
+replica_engine = _create_engine(REPLICA_DATABASE_URL) if DB_REPLICA_HOST else None
+replica_session_maker = (sessionmaker(replica_engine.execution_options(isolation_level="AUTOCOMMIT"),
+                                      class_=AsyncSession, expire_on_commit=False)
+                         if replica_engine else primary_read_session_maker)
+
+
+def read_session_maker():
+    return primary_read_session_maker if should_use_primary() else replica_session_maker
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, Response
+
+from src.auth.bookkeeping import login_bookkeeper
+from src.auth.dependency import get_current_superuser
+from src.auth.schemas import UserRead
+from src.database import engine, replica_engine
+from src.utils.metrics import render_metrics
+from src.utils.pool import get_pool_stats
+from src.utils.startup import startup_report
+from src.utils.utils import password_hasher
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+metrics_router = APIRouter(tags=["internal"])
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint, aggregated over all workers in multiprocess mode"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@router.get("/pool", status_code=200)
+async def pool_stats(current_user: UserRead = Depends(get_current_superuser)):
+    """connection pool: checked out, idle, overflow, waits and timeouts"""
+    stats = get_pool_stats(engine)
+    if replica_engine is not None:
+        stats["replica"] = get_pool_stats(replica_engine)
+    return stats
+
+
+@router.get("/hashing", status_code=200)
+async def hashing_stats(current_user: UserRead = Depends(get_current_superuser)):
+    """bcrypt pool: workers, queue depth, average wait and run time"""
+    return password_hasher.stats()
+
+
+@router.get("/startup", status_code=200)
+async def startup_stats(current_user: UserRead = Depends(get_current_superuser)):
+    """how long this worker's startup phases took and what the superuser bootstrap did"""
+    return startup_report.as_dict()
+
+
+@router.get("/logins", status_code=200)
+async def login_bookkeeping_stats(current_user: UserRead = Depends(get_current_superuser)):
+    """login bookkeeping not yet flushed by this worker"""
+    return login_bookkeeper.stats()
@@ -2,10 +2,23 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from src.auth.bookkeeping import login_bookkeeper
 from src.auth.router import router as auth_router
 from src.auth.service import UserService
+from src.config import DB_POOL_SIZE, SUPERUSER_BOOTSTRAP
+from src.database import engine, replica_engine
+from src.internal.router import router as internal_router, metrics_router
+from src.news.broker import news_broker
+from src.news.feed import news_feed
 from src.news.router import router as news_router
+from src.utils.admission import AdmissionMiddleware
+from src.utils.cache import cache
+from src.utils.metrics import PrometheusMiddleware
+from src.utils.pool import warm_up_pool
+from src.utils.replica import ReadYourWritesMiddleware
+from src.utils.startup import startup_report
 from src.utils.unitofwork import UnitOfWork
+from src.utils.utils import password_hasher
 
 app = FastAPI(
     title="Documentation for News_Project",
@@ -21,10 +34,17 @@ origins = [
 ]
 
 app.include_router(auth_router)
-# app.include_router(news_router)
+app.include_router(news_router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
 
 
 
+# the last one added is the outermost
+app.add_middleware(ReadYourWritesMiddleware)
+# inside Prometheus so shed requests still show up in http_requests_total
+app.add_middleware(AdmissionMiddleware)
+# outside admission so 503 / 429 answers carry CORS headers and browsers can read Retry-After
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -32,17 +52,37 @@ app.add_middleware(
     allow_methods=["GET", "POST", "OPTIONS", "DELETE", "PATCH", "PUT"],
     allow_headers=["Content-Type", "Set-Cookie", "Access-Control-Allow-Headers", "Access-Control-Allow-Origin",
                    "Authorization"],
+    expose_headers=["Retry-After"],
 )
+app.add_middleware(PrometheusMiddleware)
 
 
 @app.on_event("startup")
 async def startup_event():
-    uow = UnitOfWork()
-    await UserService().create_default_superuser(uow)
+    with startup_report.phase("pool_warm_up"):
+        await warm_up_pool(engine, DB_POOL_SIZE)
+    if replica_engine is not None:
+        with startup_report.phase("replica_pool_warm_up"):
+            await warm_up_pool(replica_engine, DB_POOL_SIZE)
+    if SUPERUSER_BOOTSTRAP == "startup":
+        with startup_report.phase("superuser_bootstrap"):
+            startup_report.results["superuser"] = await UserService().create_default_superuser(UnitOfWork())
+    else:
+        startup_report.results["superuser"] = "skipped"
+    login_bookkeeper.start()
+    news_broker.start()
+    with startup_report.phase("news_feed_load"):
+        await news_feed.start()
+    startup_report.log()
 
-#
-# @app.on_event("startup")
-# async def startup_event():
-#     redis = aioredis.from_url(f"redis://{REDIS_HOST}:{REDIS_PORT}", encoding="utf8", decode_responses=True)
-#     FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await login_bookkeeper.stop()
+    await news_broker.stop()
+    await news_feed.stop()
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    await cache.close()
+    password_hasher.shutdown()
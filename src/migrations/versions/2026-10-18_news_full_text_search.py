@@ -0,0 +1,50 @@
+"""News full text search
+
+Revision ID: e4a80d6b3f21
+Revises: 9b27e4c0d815
+Create Date: 2026-10-18 12:20:05.604177
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a80d6b3f21'
+down_revision: Union[str, None] = '9b27e4c0d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce({row}.title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({row}.content, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.add_column('news', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(f"""
+        CREATE FUNCTION news_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR.format(row='NEW')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER news_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, content ON news
+        FOR EACH ROW EXECUTE FUNCTION news_search_vector_update()
+    """)
+    op.execute(f"UPDATE news SET search_vector = {SEARCH_VECTOR.format(row='news')}")
+    op.create_index('ix_news_search_vector', 'news', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_news_search_vector', table_name='news', postgresql_using='gin')
+    op.execute("DROP TRIGGER news_search_vector_trigger ON news")
+    op.execute("DROP FUNCTION news_search_vector_update()")
+    op.drop_column('news', 'search_vector')
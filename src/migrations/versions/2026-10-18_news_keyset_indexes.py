@@ -0,0 +1,30 @@
+"""News keyset indexes
+
+Revision ID: 3c1f9a7d52e4
+Revises: 7e3135f8292d
+Create Date: 2026-10-18 10:12:31.482910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a7d52e4'
+down_revision: Union[str, None] = '7e3135f8292d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_news_created_at_id', 'news', ['created_at', 'id'], unique=False)
+    op.create_index('ix_news_is_public_created_at_id', 'news', ['is_public', 'created_at', 'id'], unique=False)
+    op.create_index('ix_news_author_id_created_at_id', 'news', ['author_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_news_author_id_created_at_id', table_name='news')
+    op.drop_index('ix_news_is_public_created_at_id', table_name='news')
+    op.drop_index('ix_news_created_at_id', table_name='news')
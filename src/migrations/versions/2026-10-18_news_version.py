@@ -0,0 +1,26 @@
+"""News version
+
+Revision ID: 51d6c2f8a0b7
+Revises: e4a80d6b3f21
+Create Date: 2026-10-18 13:41:12.870251
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '51d6c2f8a0b7'
+down_revision: Union[str, None] = 'e4a80d6b3f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('news', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('news', 'version')
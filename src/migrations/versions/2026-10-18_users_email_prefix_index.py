@@ -0,0 +1,26 @@
+"""Users email prefix index
+
+Revision ID: 8f3a61b9d2c4
+Revises: c2d7e95a4f18
+Create Date: 2026-10-18 16:27:05.338912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a61b9d2c4'
+down_revision: Union[str, None] = 'c2d7e95a4f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_email_lower_pattern', 'users', [sa.text('lower(email) text_pattern_ops')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower_pattern', table_name='users')
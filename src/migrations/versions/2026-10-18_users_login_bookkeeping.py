@@ -0,0 +1,28 @@
+"""Users login bookkeeping
+
+Revision ID: c2d7e95a4f18
+Revises: 51d6c2f8a0b7
+Create Date: 2026-10-18 15:02:37.114508
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d7e95a4f18'
+down_revision: Union[str, None] = '51d6c2f8a0b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('last_login_at', sa.TIMESTAMP(), nullable=True))
+    op.add_column('users', sa.Column('login_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'login_count')
+    op.drop_column('users', 'last_login_at')
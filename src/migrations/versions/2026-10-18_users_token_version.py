@@ -0,0 +1,26 @@
+"""Users token version
+
+Revision ID: 9b27e4c0d815
+Revises: 3c1f9a7d52e4
+Create Date: 2026-10-18 11:02:47.119305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b27e4c0d815'
+down_revision: Union[str, None] = '3c1f9a7d52e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
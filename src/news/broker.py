@@ -0,0 +1,182 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Optional
+
+import asyncpg
+import orjson
+
+from src.config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, NEWS_STREAM_QUEUE_SIZE
+from src.utils.metrics import NEWS_EVENTS, NEWS_STREAM_SUBSCRIBERS
+from .models import EXCERPT_LENGTH
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "news_events"
+LISTEN_RETRY = 5
+# NOTIFY payloads must stay under 8000 bytes
+NOTIFY_MAX_BYTES = 7900
+# control events: delivered to in-process listeners on every worker, never to stream subscribers
+CONTROL_EVENTS = {"reload", "principal", "news_cache"}
+
+
+def news_event(type: str, news, was_public: Optional[bool] = None) -> dict:
+    """Everything a NewsSummary needs (content cut to the excerpt), so subscribers never query back"""
+    return {
+        "type": type,
+        "id": news.id,
+        "title": news.title,
+        "excerpt": news.content[:EXCERPT_LENGTH],
+        "author_id": news.author_id,
+        "is_public": news.is_public,
+        "was_public": news.is_public if was_public is None else was_public,
+        "version": news.version,
+        "created_at": news.created_at,
+        "updated_at": news.updated_at,
+    }
+
+
+def deleted_event(news_id: int, was_public: bool) -> dict:
+    return {"type": "deleted", "id": news_id, "is_public": False, "was_public": was_public}
+
+
+def reload_event() -> dict:
+    """Too many changes to describe one by one (bulk import): listeners reload from the database"""
+    return {"type": "reload"}
+
+
+def visible_event(event: dict, public_only: bool) -> Optional[dict]:
+    """The event as the audience should see it; an article leaving the public feed is a delete there"""
+    if not public_only or event["is_public"]:
+        return event
+    if event["was_public"]:
+        return deleted_event(event["id"], True)
+    return None
+
+
+class NewsBroker:
+    """In-process fan-out of news events to stream subscribers.
+
+    The same channel carries CONTROL_EVENTS, which only in-process listeners see: cache invalidations
+    that every worker has to apply, not just the one that handled the write.
+
+    While the LISTEN connection is up, publish() goes through NOTIFY and every worker (this one included)
+    fans out what it hears, so a subscriber on any gunicorn worker sees every write. Without it events
+    stay local to the worker that made the change.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self._conn: Optional[asyncpg.Connection] = None
+        self._notify_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: list[Callable[[dict], None]] = []
+
+    def add_listener(self, callback: Callable[[dict], None]):
+        """In-process consumer called synchronously with every event, before the stream subscribers"""
+        self._listeners.append(callback)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        NEWS_STREAM_SUBSCRIBERS.inc()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.discard(queue)
+            NEWS_STREAM_SUBSCRIBERS.dec()
+
+    async def publish(self, event: dict):
+        if self._conn is not None and not self._conn.is_closed():
+            try:
+                payload = orjson.dumps(event)
+                if len(payload) > NOTIFY_MAX_BYTES:
+                    # huge title: receivers get the event without title / excerpt and refetch if they need them
+                    payload = orjson.dumps({k: v for k, v in event.items() if k not in ("title", "excerpt")})
+                async with self._notify_lock:
+                    await self._conn.execute("SELECT pg_notify($1, $2)", CHANNEL, payload.decode())
+                return
+            except Exception:
+                # the write is already committed: never fail the request over its notification
+                # (a connection closing under us raises InterfaceError, not PostgresError)
+                logger.warning("NOTIFY failed, delivering news event locally", exc_info=True)
+        self._fan_out(event)
+
+    async def events(self, public_only: bool, heartbeat: float) -> AsyncIterator[Optional[dict]]:
+        """Events visible to the audience, None after `heartbeat` idle seconds so the caller can ping"""
+        queue = self.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                event = visible_event(event, public_only)
+                if event is not None:
+                    yield event
+        finally:
+            self.unsubscribe(queue)
+
+    def _fan_out(self, event: dict):
+        NEWS_EVENTS.labels(event["type"]).inc()
+        for callback in self._listeners:
+            callback(event)
+        if event["type"] in CONTROL_EVENTS:
+            return
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # too far behind: drop it, the client reconnects and refetches the list
+                self._close(queue)
+
+    def _close(self, queue: asyncio.Queue):
+        self.unsubscribe(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def _on_notify(self, conn, pid, channel, payload):
+        self._fan_out(orjson.loads(payload))
+
+    async def _listen(self):
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASS,
+                                             database=DB_NAME)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(CHANNEL, self._on_notify)
+                self._conn = conn
+                await closed.wait()
+                logger.warning("news LISTEN connection lost, reconnecting")
+            except (asyncpg.PostgresError, OSError):
+                logger.warning("news LISTEN connection failed, retrying in %ss", LISTEN_RETRY, exc_info=True)
+            finally:
+                self._conn = None
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(LISTEN_RETRY)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in list(self._subscribers):
+            self._close(queue)
+
+
+news_broker = NewsBroker(NEWS_STREAM_QUEUE_SIZE)
@@ -0,0 +1,76 @@
+from typing import Optional
+
+from src.utils.cache import LocalCache, cache
+from src.utils.replica import mark_changed, mark_changed_locally
+from src.utils.singleflight import SingleFlight
+from .broker import news_broker
+
+PUBLIC = "public"
+AUTHENTICATED = "all"
+
+# a burst of identical cache misses runs one query; keys are the cache keys
+news_flight = SingleFlight("news")
+
+
+def audience(is_public: Optional[bool]) -> str:
+    return PUBLIC if is_public else AUTHENTICATED
+
+
+def news_key(news_id: int) -> str:
+    return f"news:item:{news_id}"
+
+
+def news_list_name(is_public: Optional[bool]) -> str:
+    """Generation name shared by every cached page and meta of the audience's list"""
+    return f"news:list:{audience(is_public)}"
+
+
+async def news_list_key(is_public: Optional[bool], cursor: Optional[str], limit: int) -> str:
+    name = news_list_name(is_public)
+    return f"{name}:summary:v{await cache.generation(name)}:{cursor or ''}:{limit}"
+
+
+async def news_list_meta_key(is_public: Optional[bool]) -> str:
+    name = news_list_name(is_public)
+    return f"{name}:meta:v{await cache.generation(name)}"
+
+
+def _invalidated(news_id: Optional[int], public: bool) -> tuple[list[str], list[str]]:
+    """(item keys, list generation names) an invalidation touches"""
+    names = [news_list_name(None)]
+    if public:
+        names.append(news_list_name(True))
+    return ([news_key(news_id)] if news_id is not None else []), names
+
+
+def _drop_local(news_id: Optional[int], public: bool):
+    keys, names = _invalidated(news_id, public)
+    news_flight.forget(*keys)
+    if isinstance(cache, LocalCache):
+        # without Redis every worker holds its own copies and list generations
+        mark_changed_locally(*keys, *names)
+        cache.discard(*keys)
+        cache.advance(*names)
+
+
+def _on_event(event: dict):
+    if event["type"] == "news_cache":
+        _drop_local(event["id"], event["public"])
+
+
+async def invalidate_news(news_id: Optional[int] = None, public: bool = False):
+    """Drop the article and every cached page it may appear on, here and then on every other worker.
+
+    Authenticated lists see every article; public lists only change when
+    a public article is touched (or an article becomes/stops being public).
+    """
+    keys, names = _invalidated(news_id, public)
+    await mark_changed(*keys, *names)
+    news_flight.forget(*keys)
+    if keys:
+        await cache.delete(*keys)
+    await cache.bump(*names)
+    await news_broker.publish({"type": "news_cache", "id": news_id, "public": public})
+
+
+news_broker.add_listener(_on_event)
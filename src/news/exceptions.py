@@ -2,3 +2,5 @@ from fastapi import HTTPException
 
 news_not_found = HTTPException(status_code=404, detail="News not found")
 unauthorized_exception = HTTPException(status_code=403, detail="Unauthorized to perform this action")
+invalid_ids_exception = HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+news_version_conflict = HTTPException(status_code=409, detail="News was modified since the given version")
@@ -0,0 +1,187 @@
+import asyncio
+import bisect
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import NEWS_FEED_MAX_ITEMS, NEWS_FEED_CHECK_INTERVAL
+from src.utils.metrics import CACHE_REQUESTS, NEWS_FEED_DRIFT, NEWS_FEED_SIZE
+from src.utils.pagination import Page, decode_cursor, encode_cursor
+from src.utils.unitofwork import UnitOfWork
+from .broker import news_broker
+from .cache import AUTHENTICATED, PUBLIC, audience
+from .schemas import NewsSummaryRecord
+
+logger = logging.getLogger(__name__)
+
+
+def _datetime(value) -> datetime:
+    # events that came through NOTIFY carry ISO strings
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _record(event: dict) -> NewsSummaryRecord:
+    return NewsSummaryRecord(event["id"], event["title"], event["excerpt"], event["author_id"], event["is_public"],
+                             _datetime(event["created_at"]), _datetime(event["updated_at"]))
+
+
+class AudienceFeed:
+    """Newest `max_items` summaries of one audience, sorted ascending by (created_at, id) in parallel arrays.
+
+    Every article with a key >= floor is present; floor is None when the whole table fits.
+    """
+
+    def __init__(self, name: str, public_only: bool, max_items: int):
+        self.name = name
+        self.public_only = public_only
+        self.max_items = max_items
+        self.keys: list[tuple[datetime, int]] = []
+        self.items: list[NewsSummaryRecord] = []
+        self.floor: Optional[tuple[datetime, int]] = None
+        self.loaded = False
+        self._key_by_id: dict[int, tuple[datetime, int]] = {}
+
+    def load(self, records: list, complete: bool) -> int:
+        """Replace the contents with `records` (newest first); returns how many entries differed"""
+        before = {(item.id, item.updated_at) for item in self.items}
+        self.items = records[::-1]
+        self.keys = [(item.created_at, item.id) for item in self.items]
+        self._key_by_id = {item.id: key for item, key in zip(self.items, self.keys)}
+        self.floor = None if complete or not self.keys else self.keys[0]
+        drift = len(before ^ {(item.id, item.updated_at) for item in self.items}) if self.loaded else 0
+        self.loaded = True
+        NEWS_FEED_SIZE.labels(self.name).set(len(self.items))
+        return drift
+
+    def remove(self, news_id: int):
+        key = self._key_by_id.pop(news_id, None)
+        if key is not None:
+            i = bisect.bisect_left(self.keys, key)
+            del self.keys[i]
+            del self.items[i]
+
+    def insert(self, record: NewsSummaryRecord):
+        key = (record.created_at, record.id)
+        if self.floor is not None and key < self.floor:
+            return
+        i = bisect.bisect_left(self.keys, key)
+        self.keys.insert(i, key)
+        self.items.insert(i, record)
+        self._key_by_id[record.id] = key
+        if len(self.keys) > self.max_items:
+            del self.keys[0]
+            self._key_by_id.pop(self.items.pop(0).id)
+            self.floor = self.keys[0]
+
+    def apply(self, event: dict):
+        self.remove(event["id"])
+        if event["type"] != "deleted" and (event["is_public"] or not self.public_only):
+            self.insert(_record(event))
+        NEWS_FEED_SIZE.labels(self.name).set(len(self.items))
+
+    def page(self, cursor: Optional[str], limit: int) -> Optional[Page]:
+        """Same page and cursor find_page would produce, or None when it reaches below the floor"""
+        end = len(self.keys)
+        if cursor:
+            end = bisect.bisect_left(self.keys, tuple(decode_cursor(cursor, (datetime, int))))
+        start = end - limit - 1
+        if start < 0 and self.floor is not None:
+            return None
+        items = self.items[max(start, 0):end][::-1]
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor([items[-1].created_at, items[-1].id])
+        return Page(items=items, next_cursor=next_cursor)
+
+
+class NewsFeed:
+    """Materialized public and authenticated list feeds, maintained from NewsBroker events.
+
+    Loaded at startup, then kept current event by event (every worker sees every write through
+    LISTEN/NOTIFY) and reloaded from the primary every `check_interval` seconds as a consistency check.
+    """
+
+    def __init__(self, max_items: int, check_interval: float):
+        self.enabled = max_items > 0
+        self.check_interval = check_interval
+        self.feeds = {PUBLIC: AudienceFeed(PUBLIC, True, max_items),
+                      AUTHENTICATED: AudienceFeed(AUTHENTICATED, False, max_items)}
+        # events seen while a reload is running, replayed on top of it
+        self._pending: Optional[list[dict]] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def page(self, is_public: Optional[bool], cursor: Optional[str], limit: int) -> Optional[Page]:
+        if not self.enabled or is_public is False:
+            return None
+        feed = self.feeds[audience(is_public)]
+        page = feed.page(cursor, limit) if feed.loaded else None
+        CACHE_REQUESTS.labels("feed", "miss" if page is None else "hit").inc()
+        return page
+
+    def on_event(self, event: dict):
+        if not self.enabled:
+            return
+        if event["type"] == "reload":
+            # also when a reload is running: it may have started before the change was committed
+            self._wake.set()
+            return
+        if self._pending is not None:
+            self._pending.append(event)
+            return
+        if event["type"] != "deleted" and "excerpt" not in event:
+            # title too long for NOTIFY: drop the entry and reload soon
+            for feed in self.feeds.values():
+                feed.remove(event["id"])
+            self._wake.set()
+            return
+        for feed in self.feeds.values():
+            feed.apply(event)
+
+    async def refresh(self):
+        self._pending = []
+        try:
+            async with UnitOfWork() as uow:
+                for feed in self.feeds.values():
+                    page = await uow.news.find_page(None, feed.max_items, is_public=True if feed.public_only else None)
+                    drift = feed.load(page.items, complete=page.next_cursor is None)
+                    if drift:
+                        NEWS_FEED_DRIFT.labels(feed.name).inc(drift)
+                        logger.warning("news feed %s was off by %d entries, reloaded", feed.name, drift)
+        finally:
+            pending, self._pending = self._pending, None
+        for event in pending:
+            self.on_event(event)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.refresh()
+            except SQLAlchemyError:
+                logger.warning("news feed consistency check failed", exc_info=True)
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            await self.refresh()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+news_feed = NewsFeed(NEWS_FEED_MAX_ITEMS, NEWS_FEED_CHECK_INTERVAL)
+news_broker.add_listener(news_feed.on_event)
@@ -1,15 +1,29 @@
 from datetime import datetime
 
-from sqlalchemy import Integer, String, Text, Boolean, ForeignKey, TIMESTAMP
+from sqlalchemy import Integer, String, Text, Boolean, ForeignKey, TIMESTAMP, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from src.auth.schemas import UserRead
 from src.database import Base
 from src.news.schemas import NewsRead
 
+# must match the news_search_vector_update() trigger in migrations
+SEARCH_CONFIG = "simple"
+# list endpoints ship this many leading characters of content instead of the body
+EXCERPT_LENGTH = 200
+# full article columns, also the column order of /news/export
+NEWS_FIELDS = ("id", "title", "content", "author_id", "is_public", "created_at", "updated_at", "version")
+
 
 class News(Base):
     __tablename__ = "news"
+    __table_args__ = (
+        Index("ix_news_created_at_id", "created_at", "id"),
+        Index("ix_news_is_public_created_at_id", "is_public", "created_at", "id"),
+        Index("ix_news_author_id_created_at_id", "author_id", "created_at", "id"),
+        Index("ix_news_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String, index=True, nullable=False)
@@ -18,6 +32,10 @@ class News(Base):
     is_public: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # optimistic concurrency: every update bumps it, clients may send the version they edited
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    # filled by a trigger from title and content, never loaded with the row
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, nullable=True, deferred=True)
 
     author = relationship("User", back_populates="news")
 
@@ -30,5 +48,5 @@ class News(Base):
             is_public=self.is_public,
             created_at=self.created_at,
             updated_at=self.updated_at,
-
-        )
\ No newline at end of file
+            version=self.version,
+        )
@@ -1,6 +1,99 @@
+from sqlalchemy import cast, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from src.utils.pagination import DEFAULT_LIMIT, Page, decode_cursor, encode_cursor
 from src.utils.repository import SQLAlchemyRepository
-from .models import News
+from .exceptions import news_not_found, unauthorized_exception, news_version_conflict
+from .models import News, SEARCH_CONFIG, EXCERPT_LENGTH, NEWS_FIELDS
+from .schemas import NewsSummaryRecord
 
 
 class NewsRepository(SQLAlchemyRepository):
     model = News
+    cursor_columns = ("created_at", "id")
+    read_columns = NEWS_FIELDS
+
+    def _list_select(self):
+        """Summary rows: the body stays in the database, only a prefix is selected"""
+        excerpt = func.left(News.content, EXCERPT_LENGTH).label("excerpt")
+        return select(News.id, News.title, excerpt, News.author_id, News.is_public, News.created_at, News.updated_at)
+
+    def _list_item(self, row):
+        return NewsSummaryRecord(*row)
+
+    async def search(self, query: str, cursor: str = None, limit: int = DEFAULT_LIMIT,
+                     is_public: bool = None) -> Page:
+        """Full-text search over title and content, best match first, keyset on (rank, id)"""
+        tsquery = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), query)
+        rank = func.ts_rank(News.search_vector, tsquery)
+        stmt = self._list_select().add_columns(rank).where(News.search_vector.bool_op("@@")(tsquery))
+        if is_public is not None:
+            stmt = stmt.where(News.is_public == is_public)
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor, [float, int])
+            stmt = stmt.where(tuple_(rank, News.id) < (last_rank, last_id))
+        stmt = stmt.order_by(rank.desc(), News.id.desc()).limit(limit + 1)
+        res = await self.session.execute(stmt)
+        rows = res.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1][-1], rows[-1].id])
+        return Page(items=[self._list_item(row[:-1]) for row in rows], next_cursor=next_cursor)
+
+    async def find_meta(self, id: int):
+        stmt = select(News.id, News.is_public, News.version, News.updated_at).where(News.id == id)
+        res = await self.session.execute(stmt)
+        return res.one_or_none()
+
+    async def list_meta(self, is_public: bool = None):
+        """(max(updated_at), count) of a feed, changes whenever any of its pages can change"""
+        stmt = select(func.max(News.updated_at), func.count())
+        if is_public is not None:
+            stmt = stmt.where(News.is_public == is_public)
+        res = await self.session.execute(stmt)
+        return res.one()
+
+    async def stream_all(self, is_public: bool = None, batch_size: int = 1000):
+        """Server-side cursor over plain rows (not entities, so the identity map stays empty).
+
+        Cursors need a transaction, so this one opens a read-only snapshot even on an autocommit session.
+        """
+        stmt = select(*[News.__table__.c[name] for name in NEWS_FIELDS]).order_by(News.created_at.desc(), News.id.desc())
+        if is_public is not None:
+            stmt = stmt.where(News.is_public == is_public)
+        conn = await self.session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+        res = await conn.stream(stmt.execution_options(yield_per=batch_size))
+        return res.partitions(batch_size)
+
+    async def edit_owned(self, id: int, author_id: int, data: dict, version: int = None):
+        """UPDATE .. WHERE id AND author_id [AND version] RETURNING the new row plus the old is_public.
+
+        Returns None when nothing matched; ownership_error tells why.
+        """
+        news, old = News.__table__, News.__table__.alias("old")
+        stmt = update(news).where(news.c.id == id, news.c.author_id == author_id, old.c.id == news.c.id)
+        if version is not None:
+            stmt = stmt.where(news.c.version == version)
+        stmt = (stmt.values(**data, version=news.c.version + 1)
+                .returning(*[c for c in news.c if c.name != "search_vector"], old.c.is_public.label("was_public")))
+        res = await self.session.execute(stmt)
+        return res.one_or_none()
+
+    async def delete_owned(self, id: int, author_id: int):
+        """DELETE .. WHERE id AND author_id RETURNING is_public, None when nothing matched"""
+        stmt = delete(News).where(News.id == id, News.author_id == author_id).returning(News.is_public)
+        res = await self.session.execute(stmt)
+        return res.scalar_one_or_none()
+
+    async def ownership_error(self, id: int, author_id: int, version: int = None):
+        """Explains a failed conditional write, only runs on the failure path"""
+        stmt = select(News.author_id, News.version).where(News.id == id)
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            return news_not_found
+        if row.author_id != author_id:
+            return unauthorized_exception
+        return news_version_conflict
@@ -1,16 +1,57 @@
-from typing import List, Optional
+import asyncio
+import logging
+from typing import AsyncIterator, List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends
+import orjson
+from fastapi import APIRouter, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from fastapi.security.utils import get_authorization_scheme_param
 
-from src.auth.dependency import get_uow, get_current_user, get_optional_current_user
+from src.auth.dependency import (get_uow, get_read_uow, get_current_user, get_optional_current_user,
+                                 principal_from_token)
 from src.utils.unitofwork import IUnitOfWork
+from .broker import news_broker
 from .dependency import get_current_author
-from .exceptions import unauthorized_exception
-from .schemas import NewsCreate, NewsUpdate, NewsRead
+from .exceptions import invalid_ids_exception, unauthorized_exception
+from .schemas import (NewsCreate, NewsUpdate, NewsRead, NewsSummary, BulkImportResult, NewsBatch, NewsBatchRequest,
+                      MAX_BATCH_IDS)
 from .service import NewsService
 from ..auth.schemas import UserRead
+from ..config import NEWS_BULK_BATCH_SIZE, NEWS_STREAM_HEARTBEAT
+from ..utils.conditional import is_conditional, is_not_modified, make_etag, not_modified, validator_headers
+from ..utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, Page
+from ..utils.responses import ORJSONResponse, ORJSONRoute
 
-router = APIRouter(prefix="/api/v1/news", tags=["news"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/news", tags=["news"], route_class=ORJSONRoute,
+                   default_response_class=ORJSONResponse)
+
+
+def is_visible(is_public: bool, current_user: Optional[UserRead]) -> bool:
+    return is_public or (current_user is not None and current_user.role != "подписчик")
+
+
+def check_visible(is_public: bool, current_user: Optional[UserRead]):
+    if not is_visible(is_public, current_user):
+        raise unauthorized_exception
+
+
+def parse_ids(ids: str) -> List[int]:
+    try:
+        parsed = [int(news_id) for news_id in ids.split(",") if news_id.strip()]
+    except ValueError:
+        raise invalid_ids_exception
+    if not parsed or len(parsed) > MAX_BATCH_IDS:
+        raise invalid_ids_exception
+    return parsed
+
+
+async def news_batch(uow: IUnitOfWork, ids: List[int], current_user: Optional[UserRead]) -> NewsBatch:
+    ids = list(dict.fromkeys(ids))
+    news = [item for item in await NewsService().get_news_batch(uow, ids) if is_visible(item.is_public, current_user)]
+    returned = {item.id for item in news}
+    return NewsBatch(items=news, missing=[news_id for news_id in ids if news_id not in returned])
 
 
 @router.post("", response_model=NewsRead)
@@ -22,36 +63,170 @@ async def create_news(news: NewsCreate,
     return news
 
 
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_create_news(request: Request,
+                           batch_size: int = Query(NEWS_BULK_BATCH_SIZE, ge=1, le=10000),
+                           uow: IUnitOfWork = Depends(get_uow),
+                           current_author: UserRead = Depends(get_current_author)):
+    """Импорт статей: тело NDJSON, по одному NewsCreate на строку, читается потоком.
+        Коммит каждые batch_size строк, в ответе результат по каждой строке"""
+    result = await NewsService().bulk_create_news(uow, request.stream(), current_author.id, batch_size)
+    return result
+
+
+@router.post("/batch", response_model=NewsBatch)
+async def read_news_batch(body: NewsBatchRequest,
+                          uow: IUnitOfWork = Depends(get_read_uow),
+                          current_user: Optional[UserRead] = Depends(get_optional_current_user)):
+    """Несколько статей одним запросом, как GET ?ids= для длинных списков.
+        Порядок как в ids; не найденные и недоступные в missing"""
+    return await news_batch(uow, body.ids, current_user)
+
+
+@router.get("/author", response_model=Page[NewsSummary])
+async def news_by_author(cursor: Optional[str] = None,
+                         limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                         uow: IUnitOfWork = Depends(get_read_uow),
+                         current_author: UserRead = Depends(get_current_author)):
+    """Выдает все статьи который написал автор, постранично по next_cursor"""
+    news_page = await NewsService().get_news_by_author(uow, current_author.id, cursor, limit)
+    return news_page
+
+
+@router.get("/search", response_model=Page[NewsSummary])
+async def search_news(q: str = Query(..., min_length=1, max_length=200),
+                      cursor: Optional[str] = None,
+                      limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                      uow: IUnitOfWork = Depends(get_read_uow),
+                      current_user: Optional[UserRead] = Depends(get_optional_current_user)):
+    """Полнотекстовый поиск по заголовку и тексту, лучшие совпадения первыми.
+        Закрытые статьи только для авторизованных, как в списке"""
+    is_public = None if current_user else True
+    news_page = await NewsService().search_news(uow, q, is_public=is_public, cursor=cursor, limit=limit)
+    return news_page
+
+
+@router.get("/export")
+async def export_news(format: Literal["ndjson", "csv"] = "ndjson",
+                      uow: IUnitOfWork = Depends(get_read_uow),
+                      current_user: Optional[UserRead] = Depends(get_optional_current_user)):
+    """Выгрузка всех статей потоком (NDJSON или CSV), память не растёт с числом статей.
+        Закрытые статьи только для авторизованных"""
+    is_public = None if current_user else True
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(NewsService().export_news(uow, is_public=is_public, format=format),
+                             media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="news.{format}"'})
+
+
+async def _sse(events: AsyncIterator[Optional[dict]]) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: 5000\n\n"
+        async for event in events:
+            if event is None:
+                yield b": ping\n\n"
+            else:
+                yield b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+    finally:
+        await events.aclose()
+
+
+@router.get("/stream")
+async def stream_news(current_user: Optional[UserRead] = Depends(get_optional_current_user)):
+    """Server-Sent Events: created / updated / deleted по мере публикации, вместо опроса списка.
+        Без авторизации только открытые статьи; закрытая стала недоступна - приходит deleted"""
+    events = news_broker.events(public_only=current_user is None, heartbeat=NEWS_STREAM_HEARTBEAT)
+    return StreamingResponse(_sse(events), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.websocket("/ws")
+async def news_socket(websocket: WebSocket, token: Optional[str] = None):
+    """То же что /stream через WebSocket, токен в Authorization или ?token="""
+    if token is None:
+        scheme, token = get_authorization_scheme_param(websocket.headers.get("Authorization"))
+        token = token if scheme.lower() == "bearer" else None
+    current_user = None
+    if token:
+        current_user = await principal_from_token(token)
+    await websocket.accept()
+
+    async def push():
+        async for event in news_broker.events(public_only=current_user is None, heartbeat=NEWS_STREAM_HEARTBEAT):
+            await websocket.send_text(orjson.dumps(event or {"type": "ping"}).decode())
+        await websocket.close()
+
+    pusher = asyncio.create_task(push())
+    try:
+        # client messages are ignored, reading only notices the disconnect
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        pusher.cancel()
+        try:
+            await pusher
+        except (asyncio.CancelledError, WebSocketDisconnect):
+            pass
+        except Exception:
+            logger.warning("news websocket push failed", exc_info=True)
+
+
 @router.get("/{news_id}", response_model=NewsRead)
 async def read_news(news_id: int,
-                    uow: IUnitOfWork = Depends(get_uow),
+                    request: Request,
+                    response: Response,
+                    uow: IUnitOfWork = Depends(get_read_uow),
                     current_user: Optional[UserRead] = Depends(get_optional_current_user)):
-    """Поиск"""
+    """Поиск. ETag/Last-Modified по version и updated_at, на If-None-Match/If-Modified-Since
+        отвечает 304 без чтения текста статьи"""
+    if is_conditional(request):
+        meta = await NewsService().get_news_meta(uow, news_id)
+        check_visible(meta.is_public, current_user)
+        etag = make_etag("news", meta.id, meta.version, meta.updated_at)
+        if is_not_modified(request, etag, meta.updated_at):
+            return not_modified(etag, meta.updated_at)
+
     news = await NewsService().get_news(uow, news_id)
-    if not news.is_public and (not current_user or (current_user and current_user.role == "подписчик")):
-        raise unauthorized_exception
+    check_visible(news.is_public, current_user)
+    response.headers.update(validator_headers(make_etag("news", news.id, news.version, news.updated_at),
+                                              news.updated_at))
     return news
 
 
-@router.get("", response_model=List[NewsRead])
-async def read_news_list(uow: IUnitOfWork = Depends(get_uow),
+@router.get("", response_model=Union[Page[NewsSummary], NewsBatch])
+async def read_news_list(request: Request,
+                         response: Response,
+                         cursor: Optional[str] = None,
+                         limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                         ids: Optional[str] = Query(None, description="1,2,3 - multi-get instead of the list"),
+                         uow: IUnitOfWork = Depends(get_read_uow),
                          current_user: Optional[UserRead] = Depends(get_optional_current_user)):
-    """выдает все статьи.
-        Если авторизован то выдает и закрытые а если нет то только открытые"""
-    if current_user:
-        news_list = await NewsService().get_all_news(uow, is_public=None)
-    else:
-        news_list = await NewsService().get_all_news(uow, is_public=True)
-    return news_list
+    """выдает статьи постранично, новые первыми; следующая страница по next_cursor.
+        Если авторизован то выдает и закрытые а если нет то только открытые.
+        ETag страницы по max(updated_at) и числу статей, 304 если ничего не менялось.
+        С ids=1,2,3 - эти статьи одним запросом (NewsBatch), см. POST /batch"""
+    if ids is not None:
+        return await news_batch(uow, parse_ids(ids), current_user)
+    is_public = None if current_user else True
+    meta = await NewsService().get_list_meta(uow, is_public=is_public)
+    etag = make_etag("news-list", is_public, cursor, limit, meta.last_modified, meta.count)
+    # ETag only: max(updated_at) stays put when an article is deleted or unpublished,
+    # so Last-Modified / If-Modified-Since would answer 304 for a list that changed
+    if is_not_modified(request, etag, None):
+        return not_modified(etag, None)
+
+    news_page = await NewsService().get_all_news(uow, is_public=is_public, cursor=cursor, limit=limit)
+    response.headers.update(validator_headers(etag, None))
+    response.headers["Vary"] = "Authorization"
+    return news_page
 
 @router.put("/{news_id}", response_model=NewsRead)
 @router.patch("/{news_id}", response_model=NewsRead)
 async def update_news(news_id: int, news: NewsUpdate,
                       uow: IUnitOfWork = Depends(get_uow),
                       current_author: UserRead = Depends(get_current_author)):
-    await NewsService().update_news(uow, news_id, news, current_author.id)
-    """Обновление статьи может только автор"""
-    updated_news = await NewsService().get_news(uow, news_id)
+    updated_news = await NewsService().update_news(uow, news_id, news, current_author.id)
+    """Обновление статьи может только автор; version в теле включает проверку на параллельную правку"""
     return updated_news
 
 
@@ -61,13 +236,3 @@ async def delete_news(news_id: int, uow: IUnitOfWork = Depends(get_uow),
    await NewsService().delete_news(uow, news_id, current_author.id)
    """Удаляет"""
    return {"message": "deleted"}
-
-
-@router.get("/author", response_model=List[NewsRead])
-async def news_by_author(uow: IUnitOfWork = Depends(get_uow),
-                         current_author: UserRead = Depends(get_current_author)):
-    """Выдает все статьи который написал автор """
-    news_list = await NewsService().get_news_by_author(uow, current_author.id)
-    return news_list
-
-
@@ -1,5 +1,11 @@
+from dataclasses import dataclass
 from datetime import datetime
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+# ids per multi-get request
+MAX_BATCH_IDS = 1000
 
 
 class NewsBase(BaseModel):
@@ -13,7 +19,8 @@ class NewsCreate(NewsBase):
 
 
 class NewsUpdate(NewsBase):
-    pass
+    # if given, the update only applies when the article is still at this version
+    version: Optional[int] = None
 
 
 class NewsRead(NewsBase):
@@ -21,6 +28,67 @@ class NewsRead(NewsBase):
     author_id: int
     created_at: datetime
     updated_at: datetime
+    version: int
 
     class Config:
         from_attributes = True
+
+
+class NewsBatchRequest(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
+
+class NewsBatch(BaseModel):
+    items: List[NewsRead]
+    # not found or not visible to the caller, in request order
+    missing: List[int]
+
+
+class NewsSummary(BaseModel):
+    id: int
+    title: str
+    excerpt: str
+    author_id: int
+    is_public: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class NewsMeta(BaseModel):
+    """What conditional GETs of one article need, without the body"""
+    id: int
+    is_public: bool
+    version: int
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class NewsListMeta(BaseModel):
+    last_modified: Optional[datetime] = None
+    count: int
+
+
+@dataclass(slots=True)
+class NewsSummaryRecord:
+    """NewsSummary as a bare record built from a list row, orjson encodes it natively"""
+    id: int
+    title: str
+    excerpt: str
+    author_id: int
+    is_public: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class BulkLineResult(BaseModel):
+    line: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkImportResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkLineResult]
@@ -1,8 +1,22 @@
-from typing import List, Optional
+import csv
+import io
+from typing import AsyncIterator, List, Optional
 
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import NEWS_BULK_BATCH_SIZE
 from src.utils.unitofwork import IUnitOfWork
-from .exceptions import news_not_found, unauthorized_exception
-from .schemas import NewsCreate, NewsUpdate, NewsRead
+from .broker import deleted_event, news_broker, news_event, reload_event
+from .cache import (cache, invalidate_news, news_flight, news_key, news_list_key, news_list_meta_key,
+                    news_list_name)
+from .exceptions import news_not_found
+from .feed import news_feed
+from .models import NEWS_FIELDS
+from .schemas import (NewsCreate, NewsUpdate, NewsRead, NewsSummary, NewsMeta, NewsListMeta, BulkLineResult,
+                      BulkImportResult)
+from ..utils.pagination import DEFAULT_LIMIT, Page
+from ..utils.replica import may_cache, should_use_primary
 from ..utils.repository import AbstractRepository
 
 
@@ -12,46 +26,189 @@ class NewsService:
         news_dict["author_id"] = author_id
         news_dict["is_public"] = news.is_public
         async with uow:
-            news_id = await uow.news.add_one(news_dict)
+            created = await uow.news.add_one(news_dict)
 
             await uow.commit()
-            return news_id
+            created = created.to_read_model()
+        await invalidate_news(public=news.is_public)
+        await news_broker.publish(news_event("created", created))
+        return created
+
+    async def bulk_create_news(self, uow: IUnitOfWork, body: AsyncIterator[bytes], author_id: int,
+                               batch_size: int = NEWS_BULK_BATCH_SIZE) -> BulkImportResult:
+        """Imports an NDJSON body of NewsCreate objects, committing every `batch_size` valid lines"""
+        results: List[BulkLineResult] = []
+        batch: List[tuple[int, dict]] = []
+        any_public = False
+
+        async def flush():
+            try:
+                ids = await uow.news.add_many([news for _, news in batch])
+                await uow.commit()
+                results.extend(BulkLineResult(line=line, id=news_id) for (line, _), news_id in zip(batch, ids))
+            except SQLAlchemyError as e:
+                await uow.rollback()
+                results.extend(BulkLineResult(line=line, error=type(e).__name__) for line, _ in batch)
+            batch.clear()
+
+        async with uow:
+            line_no = 0
+            async for raw in _ndjson_lines(body):
+                line_no += 1
+                if not raw.strip():
+                    continue
+                try:
+                    news = NewsCreate.model_validate_json(raw)
+                except ValidationError as e:
+                    error = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'line'}: {err['msg']}" for err in e.errors())
+                    results.append(BulkLineResult(line=line_no, error=error))
+                    continue
+                any_public = any_public or news.is_public
+                batch.append((line_no, {**news.model_dump(), "author_id": author_id}))
+                if len(batch) >= batch_size:
+                    await flush()
+            if batch:
+                await flush()
+
+        created = sum(result.id is not None for result in results)
+        if created:
+            await invalidate_news(public=any_public)
+            await news_broker.publish(reload_event())
+        results.sort(key=lambda result: result.line)
+        return BulkImportResult(created=created, failed=len(results) - created, results=results)
 
     async def get_news(self, uow: IUnitOfWork, news_id: int) :
+        if should_use_primary():
+            # a client that just wrote reads its own write: no cached copy, no replica query to join
+            return await self._load_news(uow, news_id)
+        cached = await cache.get(news_key(news_id))
+        if cached is not None:
+            return NewsRead.model_validate_json(cached)
+        return await news_flight.do(news_key(news_id), lambda: self._load_news(uow, news_id))
+
+    async def _load_news(self, uow: IUnitOfWork, news_id: int) -> NewsRead:
         async with uow:
-            news = await uow.news.find_one(id=news_id)
-            if not news:
+            row = await uow.news.find_one_row(id=news_id)
+            if not row:
                 raise news_not_found
-            return news.to_read_model()
+            news = NewsRead.model_validate(row)
+        if await may_cache(news_key(news_id)):
+            await cache.set(news_key(news_id), news.model_dump_json())
+        return news
 
-    async def get_all_news(self, uow: IUnitOfWork, is_public: Optional[bool] = None) -> List[NewsRead]:
+    async def get_news_batch(self, uow: IUnitOfWork, ids: List[int]) -> List[NewsRead]:
+        """Found articles in the order of `ids`, all in one query"""
         async with uow:
-            news_list = await uow.news.find_all(is_public=is_public)
-            return news_list
+            rows = await uow.news.find_many_rows(ids)
+        found = {row.id: NewsRead.model_validate(row) for row in rows}
+        return [found[news_id] for news_id in ids if news_id in found]
 
+    async def get_news_meta(self, uow: IUnitOfWork, news_id: int) -> NewsMeta:
+        cached = None if should_use_primary() else await cache.get(news_key(news_id))
+        if cached is not None:
+            return NewsMeta.model_validate_json(cached)
+        async with uow:
+            row = await uow.news.find_meta(news_id)
+            if not row:
+                raise news_not_found
+            return NewsMeta.model_validate(row)
 
-    async def get_news_by_author(self, uow: IUnitOfWork, author_id: int):
+    async def get_list_meta(self, uow: IUnitOfWork, is_public: Optional[bool] = None) -> NewsListMeta:
+        key = await news_list_meta_key(is_public)
+        cached = None if should_use_primary() else await cache.get(key)
+        if cached is not None:
+            return NewsListMeta.model_validate_json(cached)
         async with uow:
-            news_list = await uow.news.find_by_author(author_id)
-            return news_list
+            last_modified, count = await uow.news.list_meta(is_public=is_public)
+        meta = NewsListMeta(last_modified=last_modified, count=count)
+        if await may_cache(news_list_name(is_public)):
+            await cache.set(key, meta.model_dump_json())
+        return meta
 
-    async def update_news(self, uow: IUnitOfWork, news_id: int, news: NewsUpdate, author_id:int) :
-        news_dict = news.model_dump()
+    async def get_all_news(self, uow: IUnitOfWork, is_public: Optional[bool] = None,
+                           cursor: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> Page[NewsSummary]:
+        if should_use_primary():
+            # the feed may not have heard of the client's own write yet
+            key = await news_list_key(is_public, cursor, limit)
+            return await self._load_page(uow, key, is_public, cursor, limit)
+        news_page = news_feed.page(is_public, cursor, limit)
+        if news_page is not None:
+            return news_page
+        key = await news_list_key(is_public, cursor, limit)
+        cached = await cache.get(key)
+        if cached is not None:
+            return Page[NewsSummary].model_validate_json(cached)
+        return await news_flight.do(key, lambda: self._load_page(uow, key, is_public, cursor, limit))
+
+    async def _load_page(self, uow: IUnitOfWork, key: str, is_public: Optional[bool], cursor: Optional[str],
+                         limit: int) -> Page:
         async with uow:
-            existing_news = await uow.news.find_one(id=news_id)
-            if not existing_news:
-                raise news_not_found
-            if existing_news.author_id != author_id:
-                raise unauthorized_exception
-            await uow.news.edit_one(news_id, news_dict)
+            news_page = await uow.news.find_page(cursor, limit, is_public=is_public)
+        if await may_cache(news_list_name(is_public)):
+            await cache.set(key, news_page.model_dump_json())
+        return news_page
+
+
+    async def get_news_by_author(self, uow: IUnitOfWork, author_id: int,
+                                 cursor: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> Page[NewsSummary]:
+        async with uow:
+            news_page = await uow.news.find_by_author(author_id, cursor, limit)
+            return news_page
+
+    async def search_news(self, uow: IUnitOfWork, query: str, is_public: Optional[bool] = None,
+                          cursor: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> Page[NewsSummary]:
+        async with uow:
+            news_page = await uow.news.search(query, cursor, limit, is_public=is_public)
+            return news_page
+
+    async def export_news(self, uow: IUnitOfWork, is_public: Optional[bool] = None,
+                          format: str = "ndjson") -> AsyncIterator[bytes]:
+        """Yields the export chunk by chunk; the unit of work stays open until the stream ends"""
+        async with uow:
+            partitions = await uow.news.stream_all(is_public=is_public)
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(NEWS_FIELDS)
+                async for rows in partitions:
+                    writer.writerows(rows)
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue().encode()
+            else:
+                async for rows in partitions:
+                    yield b"".join(NewsRead.model_validate(row).model_dump_json().encode() + b"\n" for row in rows)
+
+    async def update_news(self, uow: IUnitOfWork, news_id: int, news: NewsUpdate, author_id:int) -> NewsRead:
+        news_dict = news.model_dump(exclude={"version"})
+        async with uow:
+            row = await uow.news.edit_owned(news_id, author_id, news_dict, version=news.version)
+            if row is None:
+                raise await uow.news.ownership_error(news_id, author_id, news.version)
             await uow.commit()
+        await invalidate_news(news_id, public=row.was_public or row.is_public)
+        updated = NewsRead.model_validate(row)
+        await news_broker.publish(news_event("updated", updated, was_public=row.was_public))
+        return updated
 
     async def delete_news(self, uow: IUnitOfWork, news_id: int, author_id: int) :
         async with uow:
-            news = await uow.news.find_one(id=news_id)
-            if not news:
-                raise news_not_found
-            if news.author_id != author_id:
-                raise unauthorized_exception
-            await uow.news.delete_one(id=news_id)
+            was_public = await uow.news.delete_owned(news_id, author_id)
+            if was_public is None:
+                raise await uow.news.ownership_error(news_id, author_id)
             await uow.commit()
+        await invalidate_news(news_id, public=was_public)
+        await news_broker.publish(deleted_event(news_id, was_public))
+
+
+async def _ndjson_lines(body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    rest = b""
+    async for chunk in body:
+        lines = (rest + chunk).split(b"\n")
+        rest = lines.pop()
+        for line in lines:
+            yield line
+    if rest:
+        yield rest
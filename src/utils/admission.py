@@ -0,0 +1,162 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import orjson
+
+from src.config import (ADMISSION_AUTH_CONCURRENCY, ADMISSION_AUTH_QUEUE, ADMISSION_NEWS_CONCURRENCY,
+                        ADMISSION_NEWS_QUEUE, ADMISSION_DEFAULT_CONCURRENCY, ADMISSION_DEFAULT_QUEUE,
+                        ADMISSION_QUEUE_TIMEOUT, ADMISSION_RETRY_AFTER, AUTH_RATE_PER_SECOND, AUTH_RATE_BURST,
+                        AUTH_RATE_MAX_CLIENTS)
+from .cache import TTLCache
+from .metrics import (ADMISSION_LIMIT, ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_QUEUE_WAIT,
+                      ADMISSION_REJECTED)
+
+AUTH_PREFIX = "/api/v1/auth/"
+# auth endpoints that run bcrypt
+HASHING_ENDPOINTS = {"login", "register", "register-superuser", "register-author", "change_password"}
+# long-lived push connections hold no DB connection, so they don't take a slot
+STREAM_PATHS = {"/api/v1/news/stream"}
+
+
+class ConcurrencyLimiter:
+    """At most `limit` requests in flight, at most `queue_size` waiting, each for at most `queue_timeout`"""
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+        ADMISSION_LIMIT.labels(name, "concurrency").set(limit)
+        ADMISSION_LIMIT.labels(name, "queue").set(queue_size)
+
+    async def acquire(self) -> Optional[str]:
+        """None when admitted, otherwise the reason for shedding"""
+        if self._semaphore.locked():
+            if self.waiting >= self.queue_size:
+                return "queue_full"
+            self.waiting += 1
+            ADMISSION_QUEUED.labels(self.name).inc()
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUED.labels(self.name).dec()
+                ADMISSION_QUEUE_WAIT.labels(self.name).observe(time.perf_counter() - start)
+        else:
+            await self._semaphore.acquire()
+        ADMISSION_IN_FLIGHT.labels(self.name).inc()
+        return None
+
+    def release(self):
+        ADMISSION_IN_FLIGHT.labels(self.name).dec()
+        self._semaphore.release()
+
+
+class TokenBucket:
+    """Per-key token bucket; idle keys expire once their bucket would be full again"""
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = TTLCache(max_keys, burst / rate)
+        ADMISSION_LIMIT.labels("auth_rate", "per_second").set(rate)
+        ADMISSION_LIMIT.labels("auth_rate", "burst").set(burst)
+
+    def take(self, key) -> float:
+        """0 when a token was taken, otherwise seconds until the next one"""
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / self.rate
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+
+@dataclass
+class _Limits:
+    auth: Optional[ConcurrencyLimiter]
+    news: Optional[ConcurrencyLimiter]
+    default: Optional[ConcurrencyLimiter]
+    auth_rate: Optional[TokenBucket]
+
+
+def _limiter(name: str, limit: int, queue_size: int) -> Optional[ConcurrencyLimiter]:
+    return ConcurrencyLimiter(name, limit, queue_size, ADMISSION_QUEUE_TIMEOUT) if limit > 0 else None
+
+
+class AdmissionMiddleware:
+    """Pure ASGI load shedding in front of the routers.
+
+    bcrypt auth endpoints, news reads and the remaining API each get their own concurrency limit and
+    bounded queue, so a spike in one group can't take the pool from the others. A full queue answers
+    503 with Retry-After straight away; the bcrypt endpoints are also rate limited per client IP (429).
+
+    The client IP is scope["client"], which uvicorn rewrites from X-Forwarded-For only for proxies listed
+    in --forwarded-allow-ips / FORWARDED_ALLOW_IPS. That has to be exactly the proxy: without it every
+    client shares nginx's bucket, with anything wider a client can pick a new address per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.limits = _Limits(
+            auth=_limiter("auth", ADMISSION_AUTH_CONCURRENCY, ADMISSION_AUTH_QUEUE),
+            news=_limiter("news_read", ADMISSION_NEWS_CONCURRENCY, ADMISSION_NEWS_QUEUE),
+            default=_limiter("default", ADMISSION_DEFAULT_CONCURRENCY, ADMISSION_DEFAULT_QUEUE),
+            auth_rate=TokenBucket(AUTH_RATE_PER_SECOND, AUTH_RATE_BURST, AUTH_RATE_MAX_CLIENTS)
+            if AUTH_RATE_PER_SECOND > 0 else None,
+        )
+
+    def _limiter_for(self, method: str, path: str) -> Optional[ConcurrencyLimiter]:
+        if _is_hashing(path):
+            return self.limits.auth
+        if method in ("GET", "HEAD") and path.startswith("/api/v1/news"):
+            return self.limits.news
+        if path.startswith("/api/"):
+            return self.limits.default
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        if self.limits.auth_rate is not None and _is_hashing(path):
+            client = scope.get("client")
+            wait = self.limits.auth_rate.take(client[0] if client else None)
+            if wait:
+                ADMISSION_REJECTED.labels("auth_rate", "rate_limited").inc()
+                return await _reject(send, 429, "Too many requests", max(1, round(wait)))
+
+        limiter = None if path in STREAM_PATHS else self._limiter_for(scope["method"], path)
+        if limiter is None:
+            return await self.app(scope, receive, send)
+
+        reason = await limiter.acquire()
+        if reason is not None:
+            ADMISSION_REJECTED.labels(limiter.name, reason).inc()
+            return await _reject(send, 503, "Server is busy, retry later", ADMISSION_RETRY_AFTER)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+def _is_hashing(path: str) -> bool:
+    return path.startswith(AUTH_PREFIX) and path[len(AUTH_PREFIX):] in HASHING_ENDPOINTS
+
+
+async def _reject(send, status: int, detail: str, retry_after: int):
+    body = orjson.dumps({"detail": detail})
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                            (b"retry-after", str(retry_after).encode())]})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,201 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from redis import asyncio as redis
+from redis.exceptions import RedisError
+
+from src.config import REDIS_HOST, REDIS_PORT, CACHE_TTL, CACHE_MAX_ENTRIES
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class AbstractCache(ABC):
+    """String key/value cache with TTL plus named generation counters.
+
+    Keys that embed a generation are invalidated all at once by bumping it,
+    which is how paginated lists are dropped without tracking every page.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: int = CACHE_TTL):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Presence check for marker keys, not counted as a hit or miss"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def generation(self, name: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bump(self, *names: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def _count(self, value):
+        if value is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels("response", "miss").inc()
+        else:
+            self.hits += 1
+            CACHE_REQUESTS.labels("response", "hit").inc()
+        return value
+
+
+class TTLCache:
+    """Bounded in-process LRU with per-entry expiry, holds arbitrary objects"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry[0] < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LocalCache(AbstractCache):
+    """In-process LRU with TTL, used when Redis is not configured"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        super().__init__()
+        self._data = TTLCache(max_entries)
+        self._generations: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._count(self._data.get(key))
+
+    async def set(self, key: str, value: str, ttl: int = CACHE_TTL):
+        self.put(key, value, ttl)
+
+    async def delete(self, *keys: str):
+        self.discard(*keys)
+
+    # synchronous set / delete / bump, for broker listeners replaying another worker's invalidation
+
+    def put(self, key: str, value: str, ttl: int = CACHE_TTL):
+        self._data.set(key, value, ttl)
+
+    def discard(self, *keys: str):
+        for key in keys:
+            self._data.pop(key)
+
+    def advance(self, *names: str):
+        for name in names:
+            self._generations[name] = self._generations.get(name, 0) + 1
+
+    async def exists(self, key: str) -> bool:
+        return self._data.get(key) is not None
+
+    async def generation(self, name: str) -> int:
+        return self._generations.get(name, 0)
+
+    async def bump(self, *names: str):
+        self.advance(*names)
+
+
+class RedisCache(AbstractCache):
+    """Shared across workers; a Redis outage degrades to cache misses, not errors"""
+
+    def __init__(self, url: str, prefix: str = "news-cache"):
+        super().__init__()
+        self.prefix = prefix
+        self.redis = redis.from_url(url, encoding="utf8", decode_responses=True)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.redis.get(self._key(key))
+        except RedisError:
+            logger.warning("cache get failed for %s", key, exc_info=True)
+            value = None
+        return self._count(value)
+
+    async def set(self, key: str, value: str, ttl: int = CACHE_TTL):
+        try:
+            await self.redis.set(self._key(key), value, ex=ttl)
+        except RedisError:
+            logger.warning("cache set failed for %s", key, exc_info=True)
+
+    async def delete(self, *keys: str):
+        try:
+            await self.redis.delete(*[self._key(key) for key in keys])
+        except RedisError:
+            logger.warning("cache delete failed for %s", keys, exc_info=True)
+
+    async def exists(self, key: str) -> bool:
+        try:
+            return bool(await self.redis.exists(self._key(key)))
+        except RedisError:
+            # can't tell: assume it is there, callers use it to stay on the safe side
+            logger.warning("cache exists failed for %s", key, exc_info=True)
+            return True
+
+    async def generation(self, name: str) -> int:
+        try:
+            return int(await self.redis.get(self._key(f"gen:{name}")) or 0)
+        except RedisError:
+            logger.warning("cache generation failed for %s", name, exc_info=True)
+            return 0
+
+    async def bump(self, *names: str):
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for name in names:
+                    pipe.incr(self._key(f"gen:{name}"))
+                await pipe.execute()
+        except RedisError:
+            logger.warning("cache bump failed for %s", names, exc_info=True)
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_cache() -> AbstractCache:
+    if REDIS_HOST:
+        return RedisCache(f"redis://{REDIS_HOST}:{REDIS_PORT}")
+    return LocalCache()
+
+
+cache = create_cache()
@@ -0,0 +1,11 @@
+from fastapi import HTTPException, status
+
+invalid_cursor_exception = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Invalid pagination cursor",
+)
+
+upstream_timeout_exception = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Timed out waiting for the database",
+)
@@ -0,0 +1,134 @@
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR and
+# /metrics aggregates them, see gunicorn.conf.py
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served", ["method"],
+                             multiprocess_mode="livesum")
+
+DB_STATEMENTS_PER_REQUEST = Histogram("db_statements_per_request", "SQL statements issued per request", ["route"],
+                                      buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50))
+DB_TIME_PER_REQUEST = Histogram("db_time_per_request_seconds", "Time spent in SQL per request", ["route"])
+DB_STATEMENT_LATENCY = Histogram("db_statement_duration_seconds", "SQL statement latency")
+
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections checked out of the pool",
+                         multiprocess_mode="livesum")
+POOL_WAIT = Histogram("db_pool_wait_seconds", "Time spent waiting for a pooled connection")
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Pool checkouts that timed out")
+
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups", ["cache", "result"])
+SINGLEFLIGHT_CALLS = Counter("singleflight_calls_total", "Single-flight calls that ran the query or joined one",
+                             ["name", "result"])
+
+ADMISSION_LIMIT = Gauge("admission_limit", "Configured admission limit per worker", ["group", "kind"],
+                        multiprocess_mode="max")
+ADMISSION_IN_FLIGHT = Gauge("admission_in_flight", "Admitted requests being served", ["group"],
+                            multiprocess_mode="livesum")
+ADMISSION_QUEUED = Gauge("admission_queued", "Requests waiting for admission", ["group"],
+                         multiprocess_mode="livesum")
+ADMISSION_QUEUE_WAIT = Histogram("admission_queue_wait_seconds", "Time spent waiting for admission", ["group"])
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests shed by admission control", ["group", "reason"])
+
+NEWS_STREAM_SUBSCRIBERS = Gauge("news_stream_subscribers", "Open SSE / WebSocket news subscriptions",
+                                multiprocess_mode="livesum")
+NEWS_EVENTS = Counter("news_events_total", "News events fanned out to subscribers", ["type"])
+NEWS_FEED_SIZE = Gauge("news_feed_items", "Summaries held by the in-memory feed", ["audience"],
+                       multiprocess_mode="max")
+NEWS_FEED_DRIFT = Counter("news_feed_drift_total", "Feed entries found stale by the consistency check", ["audience"])
+
+
+@dataclass
+class _RequestDbStats:
+    statements: int = 0
+    time: float = 0.0
+
+
+_request_db_stats: ContextVar[Optional[_RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Time every statement and attribute it to the request being served"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_STATEMENT_LATENCY.observe(elapsed)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.time += elapsed
+
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        POOL_CHECKED_OUT.dec()
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class PrometheusMiddleware:
+    """Pure ASGI, labels by route template so /news/1 and /news/2 share a series"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = _RequestDbStats()
+        token = _request_db_stats.set(stats)
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            _request_db_stats.reset(token)
+            route = _route_template(scope)
+            REQUESTS.labels(method, route, str(status)).inc()
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            DB_STATEMENTS_PER_REQUEST.labels(route).observe(stats.statements)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.time)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,35 @@
+import base64
+import json
+from datetime import datetime
+from typing import Generic, List, Optional, Sequence, TypeVar
+
+from pydantic import BaseModel
+
+from .exceptions import invalid_cursor_exception
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Opaque cursor: urlsafe base64 of the keyset values of the last row on the page"""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> list:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(types):
+            raise ValueError(cursor)
+        return [datetime.fromisoformat(value) if type_ is datetime else type_(value)
+                for value, type_ in zip(raw, types)]
+    except (ValueError, TypeError):
+        raise invalid_cursor_exception
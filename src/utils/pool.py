@@ -0,0 +1,71 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .metrics import POOL_TIMEOUTS, POOL_WAIT
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool that records how long checkouts wait and how many time out"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.stats.checkouts += 1
+            self.stats.wait_time_total += waited
+            self.stats.wait_time_max = max(self.stats.wait_time_max, waited)
+            POOL_WAIT.observe(waited)
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    stats = getattr(pool, "stats", PoolStats())
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_time_total": stats.wait_time_total,
+        "wait_time_avg": stats.wait_time_total / stats.checkouts if stats.checkouts else 0.0,
+        "wait_time_max": stats.wait_time_max,
+    }
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int):
+    """Open `connections` connections at startup so first requests don't pay for connect/TLS/auth"""
+
+    async def _open():
+        async with engine.connect():
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(_open() for _ in range(connections)))
@@ -0,0 +1,100 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from http.cookies import SimpleCookie
+from typing import Optional
+
+from src.config import DB_REPLICA_HOST, DB_REPLICA_STICKY_SECONDS
+from .cache import LocalCache, cache
+
+STICKY_COOKIE = "db_primary_until"
+CHANGED_PREFIX = "changed"
+
+
+@dataclass
+class _ClientState:
+    primary_until: float = 0.0
+    wrote: bool = False
+
+
+_client_state: ContextVar[Optional[_ClientState]] = ContextVar("client_state", default=None)
+
+
+def should_use_primary() -> bool:
+    """True while the current client may not see its own writes on the replica yet"""
+    state = _client_state.get()
+    return state is not None and (state.wrote or state.primary_until > time.time())
+
+
+def mark_write():
+    state = _client_state.get()
+    if state is not None:
+        state.wrote = True
+
+
+def reads_may_lag() -> bool:
+    """True when the current request reads from a replica that may miss the latest writes"""
+    return bool(DB_REPLICA_HOST) and not should_use_primary()
+
+
+async def mark_changed(*names: str):
+    """Keep replica reads of `names` out of the shared cache for the next DB_REPLICA_STICKY_SECONDS.
+
+    Called on invalidation: a lagging replica would otherwise put the old value right back for CACHE_TTL.
+    """
+    if DB_REPLICA_HOST and DB_REPLICA_STICKY_SECONDS > 0:
+        for name in names:
+            await cache.set(f"{CHANGED_PREFIX}:{name}", "1", ttl=DB_REPLICA_STICKY_SECONDS)
+
+
+def mark_changed_locally(*names: str):
+    """mark_changed() on this worker's LocalCache, for a write another worker made (Redis is already shared)"""
+    if DB_REPLICA_HOST and DB_REPLICA_STICKY_SECONDS > 0 and isinstance(cache, LocalCache):
+        for name in names:
+            cache.put(f"{CHANGED_PREFIX}:{name}", "1", ttl=DB_REPLICA_STICKY_SECONDS)
+
+
+async def may_cache(name: str) -> bool:
+    """Whether what the current request just read for `name` is safe to share through a cache"""
+    return not reads_may_lag() or not await cache.exists(f"{CHANGED_PREFIX}:{name}")
+
+
+class ReadYourWritesMiddleware:
+    """Pins a client to the primary for DB_REPLICA_STICKY_SECONDS after it wrote.
+
+    The deadline travels in a cookie, so it holds whichever worker serves the next request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        state = _ClientState(primary_until=self._read_cookie(scope))
+        token = _client_state.set(state)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state.wrote:
+                cookie = (f"{STICKY_COOKIE}={time.time() + DB_REPLICA_STICKY_SECONDS:.3f}; "
+                          f"Max-Age={DB_REPLICA_STICKY_SECONDS}; Path=/; HttpOnly; SameSite=Lax")
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _client_state.reset(token)
+
+    @staticmethod
+    def _read_cookie(scope) -> float:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(STICKY_COOKIE)
+                if morsel is not None:
+                    try:
+                        return float(morsel.value)
+                    except ValueError:
+                        return 0.0
+        return 0.0
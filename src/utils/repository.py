@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
 
-from sqlalchemy import insert, select, update, delete
+from sqlalchemy import Integer, any_, bindparam, insert, select, update, delete, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .pagination import DEFAULT_LIMIT, Page, decode_cursor, encode_cursor
+
 
 class AbstractRepository(ABC):
     @abstractmethod
@@ -17,6 +20,10 @@ class AbstractRepository(ABC):
     async def find_one(self, **filter_by):
         raise NotImplementedError
 
+    @abstractmethod
+    async def find_one_row(self, **filter_by):
+        raise NotImplementedError
+
     @abstractmethod
     async def edit_one(self, id: int, data: dict):
         raise NotImplementedError
@@ -25,9 +32,25 @@ class AbstractRepository(ABC):
     async def delete_one(self, id: int):
         raise NotImplementedError
 
+    @abstractmethod
+    async def add_many(self, data: list[dict]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def edit_many(self, data: list[dict]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_many(self, ids: list[int]):
+        raise NotImplementedError
+
 
 class SQLAlchemyRepository(AbstractRepository):
     model = None
+    # keyset for find_page, newest first; must be unique as a whole
+    cursor_columns = ("id",)
+    # what read-only queries select, None for every column; leave out what must never leave the database
+    read_columns = None
 
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -57,17 +80,57 @@ class SQLAlchemyRepository(AbstractRepository):
         res = await self.session.execute(stmt)
         return res.scalar_one_or_none()
 
-    async def find_by_author(self, author_id: int):
-        stmt = select(self.model).where(self.model.author_id == author_id)
+    def _read_columns(self):
+        names = self.read_columns or [column.key for column in self.model.__table__.c]
+        return [getattr(self.model, name) for name in names]
+
+    def _list_select(self):
+        """Core select over read_columns: plain rows, no entity hydration or identity map"""
+        return select(*self._read_columns())
+
+    def _list_item(self, row):
+        return row
+
+    async def find_page(self, cursor: str = None, limit: int = DEFAULT_LIMIT, criteria: tuple = (),
+                        **filter_by) -> Page:
+        """Keyset pagination over cursor_columns, None filters are skipped, criteria are extra WHERE clauses"""
+        columns = [getattr(self.model, name) for name in self.cursor_columns]
+        stmt = self._list_select().filter_by(**{k: v for k, v in filter_by.items() if v is not None})
+        if criteria:
+            stmt = stmt.where(*criteria)
+        if cursor:
+            values = decode_cursor(cursor, [column.type.python_type for column in columns])
+            stmt = stmt.where(tuple_(*columns) < tuple(values))
+        stmt = stmt.order_by(*[column.desc() for column in columns]).limit(limit + 1)
         res = await self.session.execute(stmt)
-        res = [row[0].to_read_model() for row in res.all()]
-        return res
+        rows = res.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([getattr(rows[-1], name) for name in self.cursor_columns])
+        return Page(items=[self._list_item(row) for row in rows], next_cursor=next_cursor)
+
+    async def find_by_author(self, author_id: int, cursor: str = None, limit: int = DEFAULT_LIMIT) -> Page:
+        return await self.find_page(cursor, limit, author_id=author_id)
 
     async def find_one(self, **filter_by):
         stmt = select(self.model).filter_by(**filter_by)
         res = await self.session.execute(stmt)
         return res.scalar_one_or_none()
 
+    async def find_one_row(self, **filter_by):
+        """find_one for read-only callers: a Row of read_columns instead of a tracked entity"""
+        stmt = select(*self._read_columns()).filter_by(**filter_by)
+        res = await self.session.execute(stmt)
+        return res.one_or_none()
+
+    async def find_many_rows(self, ids: list[int]) -> list:
+        """Rows of read_columns for `ids` in one `id = ANY(:ids)` query (one statement for any count), unordered"""
+        stmt = select(*self._read_columns()).where(self.model.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+        res = await self.session.execute(stmt)
+        return res.all()
+
     async def edit_one(self, id: int, data: dict):
         stmt = update(self.model).where(self.model.id == id).values(**data).returning(self.model.id)
         res = await self.session.execute(stmt)
@@ -77,3 +140,23 @@ class SQLAlchemyRepository(AbstractRepository):
         stmt = delete(self.model).where(self.model.id == id).returning(self.model.id)
         res = await self.session.execute(stmt)
         return res.scalar_one()
+
+    async def add_many(self, data: list[dict]) -> list[int]:
+        """Multi-row INSERT .. RETURNING id, ids come back in the order of `data`"""
+        if not data:
+            return []
+        stmt = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+        res = await self.session.execute(stmt, data)
+        return list(res.scalars().all())
+
+    async def edit_many(self, data: list[dict]):
+        """executemany UPDATE by primary key, every dict needs an "id" """
+        if data:
+            await self.session.execute(update(self.model), data)
+
+    async def delete_many(self, ids: list[int]) -> list[int]:
+        if not ids:
+            return []
+        stmt = delete(self.model).where(self.model.id.in_(ids)).returning(self.model.id)
+        res = await self.session.execute(stmt)
+        return list(res.scalars().all())
@@ -0,0 +1,63 @@
+import asyncio
+import functools
+from typing import Any
+
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from fastapi.utils import is_body_allowed_for_status_code
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+from starlette.routing import request_response
+
+
+def _default(obj):
+    # shallow: nested models come back through here, records and datetimes are native to orjson
+    if isinstance(obj, BaseModel):
+        return dict(obj)
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(JSONResponse):
+    """Encodes dicts, lists and pydantic models (already validated) straight to bytes"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONRoute(APIRoute):
+    """Route whose result is encoded once with orjson.
+
+    The endpoint already builds its read models from rows, so FastAPI's
+    re-validation against response_model and jsonable_encoder pass are
+    skipped; response_model is still used for the OpenAPI schema. Endpoints
+    must return pydantic models, dicts or lists of them, never ORM objects.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        call = self.dependant.call
+        response_param = self.dependant.response_param_name
+        status_code = self.status_code
+
+        @functools.wraps(call)
+        async def encode(**values):
+            if asyncio.iscoroutinefunction(call):
+                content = await call(**values)
+            else:
+                content = await run_in_threadpool(call, **values)
+            if isinstance(content, Response):
+                return content
+
+            sub_response = values.get(response_param) if response_param else None
+            code = (sub_response.status_code if sub_response is not None else None) or status_code or 200
+            if is_body_allowed_for_status_code(code):
+                response = ORJSONResponse(content, status_code=code)
+            else:
+                response = Response(status_code=code)
+            if sub_response is not None:
+                response.headers.raw.extend(sub_response.headers.raw)
+            return response
+
+        self.dependant.call = encode
+        self.app = request_response(self.get_route_handler())
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from src.config import SINGLEFLIGHT_TIMEOUT
+from .exceptions import upstream_timeout_exception
+from .metrics import SINGLEFLIGHT_CALLS
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight call: its result, or its exception, goes to all.
+
+    The call runs in its own task, so a caller that goes away doesn't cancel it for the others,
+    and is bounded by `timeout` (503 for every waiter).
+    """
+
+    def __init__(self, name: str, timeout: float = SINGLEFLIGHT_TIMEOUT):
+        self.name = name
+        self.timeout = timeout
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            SINGLEFLIGHT_CALLS.labels(self.name, "executed").inc()
+            task = asyncio.create_task(asyncio.wait_for(fn(), self.timeout))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            SINGLEFLIGHT_CALLS.labels(self.name, "coalesced").inc()
+        try:
+            return await asyncio.shield(task)
+        except asyncio.TimeoutError:
+            raise upstream_timeout_exception
+
+    def forget(self, *keys: Hashable):
+        """Later callers start a fresh call instead of joining one that began before a write"""
+        for key in keys:
+            self._calls.pop(key, None)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # every waiter may be gone, don't let asyncio log the exception as never retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self):
+        return len(self._calls)
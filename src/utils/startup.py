@@ -0,0 +1,33 @@
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Wall time of each startup phase in this process, logged once and served by /internal/startup"""
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.results: dict[str, str] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def as_dict(self) -> dict:
+        return {"total_ms": round(sum(self.phases.values()), 1), "phases_ms": dict(self.phases),
+                "results": dict(self.results)}
+
+    def log(self):
+        report = self.as_dict()
+        logger.info("startup took %.1f ms: %s %s", report["total_ms"],
+                    ", ".join(f"{name}={ms} ms" for name, ms in self.phases.items()), self.results)
+
+
+startup_report = StartupReport()
@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
 from typing import Type
 
-from src.database import async_session_maker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import async_session_maker, read_session_maker
 from src.auth.repository import UsersRepository
 from src.news.repository import NewsRepository
+from src.utils.replica import mark_write
 
 
 # https://github1s.com/cosmicpython/code/tree/chapter_06_uow
@@ -33,22 +36,52 @@ class IUnitOfWork(ABC):
 
 
 class UnitOfWork:
-    def __init__(self):
+    """Session and repositories are created on first access, so a unit answered from cache never touches the pool.
+
+    Read-only units run in autocommit (no BEGIN, no trailing ROLLBACK) on the replica unless the client
+    has to see its own writes; they must not be used for writes.
+    """
+
+    def __init__(self, read_only: bool = False):
+        self.read_only = read_only
         self.session_factory = async_session_maker
 
     async def __aenter__(self):
-        self.session = self.session_factory()
-        self.users = UsersRepository(self.session)
-        self.news = NewsRepository(self.session)
+        self._session = None
+        self._users = None
+        self._news = None
 
         return self
 
     async def __aexit__(self, *args):
-        await self.rollback()
-        await self.session.close()
+        if self._session is None:
+            return
+        if not self.read_only:
+            await self.rollback()
+        await self._session.close()
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            factory = read_session_maker() if self.read_only else self.session_factory
+            self._session = factory()
+        return self._session
+
+    @property
+    def users(self) -> UsersRepository:
+        if self._users is None:
+            self._users = UsersRepository(self.session)
+        return self._users
+
+    @property
+    def news(self) -> NewsRepository:
+        if self._news is None:
+            self._news = NewsRepository(self.session)
+        return self._news
 
     async def commit(self):
         await self.session.commit()
+        mark_write()
 
     async def rollback(self):
         await self.session.rollback()
@@ -0,0 +1,71 @@
+import httpx
+
+from src.main import app, origins
+from src.utils import admission
+from src.utils.admission import AdmissionMiddleware, TokenBucket
+
+
+def test_bucket_allows_burst_then_reports_wait(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2, burst=3, max_keys=10)
+
+    assert [bucket.take("a") for _ in range(3)] == [0, 0, 0]
+    assert bucket.take("a") == 0.5
+    # other clients have their own bucket
+    assert bucket.take("b") == 0
+
+    now[0] += 0.5
+    assert bucket.take("a") == 0
+    assert bucket.take("a") > 0
+
+
+def test_bucket_refills_up_to_burst(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=1, burst=2, max_keys=10)
+    bucket.take("a")
+    bucket.take("a")
+
+    now[0] += 60
+    assert [bucket.take("a") for _ in range(3)] == [0, 0, 1.0]
+
+
+async def test_only_hashing_endpoints_are_rate_limited(monkeypatch):
+    monkeypatch.setattr(admission, "AUTH_RATE_PER_SECOND", 1)
+    monkeypatch.setattr(admission, "AUTH_RATE_BURST", 1)
+    statuses = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    middleware = AdmissionMiddleware(app)
+
+    async def call(method, path):
+        scope = {"type": "http", "method": method, "path": path, "client": ("10.0.0.1", 1234)}
+        await middleware(scope, None, send)
+
+    for _ in range(3):
+        await call("GET", "/api/v1/auth/profile")
+    await call("POST", "/api/v1/auth/login")
+    await call("POST", "/api/v1/auth/login")
+
+    assert statuses == [200, 200, 200, 200, 429]
+
+
+async def test_shed_response_carries_cors_headers(monkeypatch):
+    # no token at all: the first login is already over the limit, the route is never reached
+    monkeypatch.setattr(admission, "AUTH_RATE_PER_SECOND", 1)
+    monkeypatch.setattr(admission, "AUTH_RATE_BURST", 0)
+    monkeypatch.setattr(app, "middleware_stack", None)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/v1/auth/login", headers={"Origin": origins[0]}, json={})
+
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] == origins[0]
+    assert "retry-after" in response.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from starlette.requests import Request
+
+from src.utils.conditional import http_date, is_not_modified, make_etag
+
+LAST_MODIFIED = datetime(2024, 3, 1, 10, 0, 0, 500000)
+ETAG = make_etag(1, LAST_MODIFIED)
+
+
+def request(**headers) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/",
+                    "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]})
+
+
+def test_unconditional_request_is_modified():
+    assert not is_not_modified(request(), ETAG, LAST_MODIFIED)
+
+
+def test_if_none_match():
+    assert is_not_modified(request(if_none_match=ETAG), ETAG, LAST_MODIFIED)
+    assert is_not_modified(request(if_none_match=f'"other", W/{ETAG}'), ETAG, LAST_MODIFIED)
+    assert is_not_modified(request(if_none_match="*"), ETAG, LAST_MODIFIED)
+    assert not is_not_modified(request(if_none_match='"other"'), ETAG, LAST_MODIFIED)
+
+
+def test_if_modified_since_ignores_sub_second_precision():
+    assert is_not_modified(request(if_modified_since=http_date(LAST_MODIFIED)), ETAG, LAST_MODIFIED)
+    assert not is_not_modified(request(if_modified_since="Fri, 01 Mar 2024 09:59:59 GMT"), ETAG, LAST_MODIFIED)
+    assert not is_not_modified(request(if_modified_since="yesterday"), ETAG, LAST_MODIFIED)
+    assert not is_not_modified(request(if_modified_since=http_date(LAST_MODIFIED)), ETAG, None)
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    assert not is_not_modified(request(if_none_match='"other"', if_modified_since=http_date(LAST_MODIFIED)),
+                               ETAG, LAST_MODIFIED)
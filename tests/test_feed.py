@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+
+from src.news.broker import deleted_event
+from src.news.feed import AudienceFeed, NewsFeed
+from src.news.schemas import NewsSummaryRecord
+from src.utils.pagination import decode_cursor, encode_cursor
+
+START = datetime(2024, 1, 1)
+
+
+def record(news_id: int, is_public: bool = True, minutes: int = None) -> NewsSummaryRecord:
+    created_at = START + timedelta(minutes=news_id if minutes is None else minutes)
+    return NewsSummaryRecord(news_id, f"title {news_id}", "excerpt", 1, is_public, created_at, created_at)
+
+
+def event(type: str, news: NewsSummaryRecord, was_public: bool = None) -> dict:
+    return {"type": type, "id": news.id, "title": news.title, "excerpt": news.excerpt, "author_id": news.author_id,
+            "is_public": news.is_public, "was_public": news.is_public if was_public is None else was_public,
+            "version": 1, "created_at": news.created_at, "updated_at": news.updated_at}
+
+
+def find_page(records: list, cursor, limit: int):
+    """What SQLAlchemyRepository.find_page returns for `records`, newest first by (created_at, id)"""
+    rows = sorted(records, key=lambda item: (item.created_at, item.id), reverse=True)
+    if cursor:
+        bound = tuple(decode_cursor(cursor, (datetime, int)))
+        rows = [item for item in rows if (item.created_at, item.id) < bound]
+    rows = rows[:limit + 1]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].created_at, rows[-1].id])
+    return rows, next_cursor
+
+
+def newest_first(records: list) -> list:
+    return sorted(records, key=lambda item: (item.created_at, item.id), reverse=True)
+
+
+def test_pages_match_find_page():
+    # equal timestamps too, so the id tie-break matters
+    records = [record(i, minutes=i // 3) for i in range(1, 21)]
+    feed = AudienceFeed("test", False, 100)
+    feed.load(newest_first(records), complete=True)
+
+    cursor = None
+    for _ in range(10):
+        page = feed.page(cursor, 6)
+        expected_items, expected_cursor = find_page(records, cursor, 6)
+        assert page.items == expected_items
+        assert page.next_cursor == expected_cursor
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert cursor is None
+
+
+def test_window_keeps_newest_and_raises_floor():
+    feed = AudienceFeed("test", False, 3)
+    feed.load([], complete=True)
+    for i in range(1, 6):
+        feed.insert(record(i))
+
+    assert [item.id for item in feed.items] == [3, 4, 5]
+    assert feed.floor == (record(3).created_at, 3)
+
+    # older than the floor: the feed can't tell where it belongs, so it stays out
+    feed.insert(record(2))
+    assert [item.id for item in feed.items] == [3, 4, 5]
+
+
+def test_page_below_floor_falls_back():
+    records = [record(i) for i in range(1, 11)]
+    feed = AudienceFeed("test", False, 5)
+    feed.load(newest_first(records)[:5], complete=False)
+
+    first = feed.page(None, 3)
+    assert first.items == find_page(records, None, 3)[0]
+    assert first.next_cursor == find_page(records, None, 3)[1]
+    # the second page would need rows older than the floor: the caller goes to the database
+    assert feed.page(first.next_cursor, 3) is None
+    # a page that ends exactly at the floor is still not known to be the last one
+    assert feed.page(None, 5) is None
+
+
+def test_complete_feed_answers_the_last_page():
+    records = [record(i) for i in range(1, 4)]
+    feed = AudienceFeed("test", False, 5)
+    feed.load(newest_first(records), complete=True)
+
+    page = feed.page(None, 5)
+    assert page.items == newest_first(records)
+    assert page.next_cursor is None
+
+
+def test_apply_updates_deletes_and_visibility():
+    public = AudienceFeed("public", True, 10)
+    public.load([], complete=True)
+    news = record(1)
+    hidden = record(2, is_public=False)
+
+    public.apply(event("created", news))
+    public.apply(event("created", hidden))
+    assert [item.id for item in public.items] == [1]
+
+    renamed = NewsSummaryRecord(1, "renamed", news.excerpt, 1, True, news.created_at, news.updated_at)
+    public.apply(event("updated", renamed))
+    assert [item.title for item in public.items] == ["renamed"]
+
+    unpublished = NewsSummaryRecord(1, "renamed", news.excerpt, 1, False, news.created_at, news.updated_at)
+    public.apply(event("updated", unpublished, was_public=True))
+    assert public.items == []
+
+    public.apply(event("created", news))
+    public.apply(deleted_event(1, True))
+    assert public.items == [] and public.keys == []
+
+
+def test_reload_event_wakes_the_consistency_check():
+    feed = NewsFeed(10, 60)
+    feed._pending = []
+
+    feed.on_event({"type": "reload"})
+
+    assert feed._wake.is_set()
+    assert feed._pending == []
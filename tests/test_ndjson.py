@@ -0,0 +1,27 @@
+from src.news.service import _ndjson_lines
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def lines(*parts: bytes) -> list:
+    return [line async for line in _ndjson_lines(chunks(*parts))]
+
+
+async def test_lines_split_across_chunks():
+    assert await lines(b'{"a": 1}\n{"b"', b': 2}\n', b'{"c": 3}') == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+async def test_blank_lines_are_kept_for_numbering():
+    assert await lines(b'{"a": 1}\n\n{"b": 2}\n') == [b'{"a": 1}', b"", b'{"b": 2}']
+
+
+async def test_empty_body():
+    assert await lines() == []
+    assert await lines(b"") == []
+
+
+async def test_line_spanning_many_chunks():
+    assert await lines(b"{", b'"a"', b": ", b"1}", b"\n") == [b'{"a": 1}']
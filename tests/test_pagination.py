@@ -0,0 +1,23 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from src.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    values = [datetime(2024, 5, 17, 12, 30, 1, 250), 42]
+
+    cursor = encode_cursor(values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, (datetime, int)) == values
+
+
+@pytest.mark.parametrize("cursor", ["not base64 !", encode_cursor([1]), encode_cursor(["yesterday", 1]),
+                                    encode_cursor([datetime(2024, 1, 1), "x"]), "e30"])
+def test_bad_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, (datetime, int))
+    assert exc.value.status_code == 400
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.utils.singleflight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*[flight.do("key", load) for _ in range(5)])
+
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert len(flight) == 0
+
+
+async def test_error_goes_to_every_waiter():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*[flight.do("key", load) for _ in range(3)], return_exceptions=True)
+
+    assert calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    # the failure is not remembered: the next caller runs a fresh call
+    with pytest.raises(ValueError):
+        await flight.do("key", load)
+    assert calls == 2
+
+
+async def test_timeout_answers_every_waiter_with_503():
+    flight = SingleFlight("test", timeout=0.05)
+
+    async def load():
+        await asyncio.sleep(1)
+
+    results = await asyncio.gather(*[flight.do("key", load) for _ in range(3)], return_exceptions=True)
+
+    assert all(isinstance(result, HTTPException) and result.status_code == 503 for result in results)
+    assert len(flight) == 0
+
+
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("test")
+
+    async def load():
+        await asyncio.sleep(0.05)
+        return "value"
+
+    first = asyncio.create_task(flight.do("key", load))
+    second = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "value"
+
+
+async def test_forget_starts_a_fresh_call():
+    flight = SingleFlight("test")
+    versions = iter(["old", "new"])
+
+    async def load():
+        value = next(versions)
+        await asyncio.sleep(0.02)
+        return value
+
+    before = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    flight.forget("key")
+    after = await flight.do("key", load)
+
+    assert await before == "old"
+    assert after == "new"